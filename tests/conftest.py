@@ -0,0 +1,228 @@
+"""Shared pytest fixtures for TreLLM tests."""
+
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from trellm.claude import ClaudeRunner
+from trellm.config import ClaudeConfig
+from trellm.state import StateManager
+from trellm.trello import TrelloCard
+
+# Cumulative setup time per fixture name, filled in when --fixture-durations
+# is given.
+_fixture_setup_seconds: defaultdict[str, float] = defaultdict(float)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--fixture-durations",
+        type=int,
+        default=None,
+        metavar="N",
+        help="show N slowest fixture setups, summed per fixture (N=0 for all)",
+    )
+    parser.addoption(
+        "--cached",
+        action="store_true",
+        help="keep .pytest_cache when running only the maintenance test modules",
+    )
+
+
+def _only_maintenance_tests(config) -> bool:
+    """Whether the command line selects only tests/test_maintenance*.py."""
+    return bool(config.args) and all(
+        Path(arg.split("::")[0]).name.startswith("test_maintenance")
+        for arg in config.args
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    if not config.pluginmanager.has_plugin("cacheprovider"):
+        return
+    if config.getoption("--cached") or any(
+        config.getoption(name, False) for name in ("lf", "failedfirst", "newfirst")
+    ):
+        return
+    # The maintenance modules finish in milliseconds and gain nothing from
+    # last-failed reruns, so runs limited to them skip the cache. Any other
+    # run records it as usual, which keeps a later --lf meaningful.
+    if not _only_maintenance_tests(config):
+        return
+    # cacheprovider's own tryfirst pytest_configure runs after this one and
+    # registers these; blocking them leaves nothing that writes the cache.
+    config.pluginmanager.set_blocked("lfplugin")
+    config.pluginmanager.set_blocked("nfplugin")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    if request.config.getoption("--fixture-durations") is None:
+        yield
+        return
+    start = time.perf_counter()
+    yield
+    _fixture_setup_seconds[fixturedef.argname] += time.perf_counter() - start
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    limit = config.getoption("--fixture-durations")
+    if limit is None:
+        return
+    terminalreporter.section("fixture setup durations")
+    slowest = sorted(
+        _fixture_setup_seconds.items(), key=lambda item: item[1], reverse=True
+    )
+    for name, seconds in slowest[:limit or None]:
+        terminalreporter.write_line(f"{seconds:.4f}s {name}")
+
+
+@pytest.fixture(scope="session")
+def runner():
+    """Shared yolo-mode ClaudeRunner.
+
+    ClaudeRunner holds no per-run state, and tests that stub its methods do
+    so through ``patch.object`` or ``monkeypatch``, both of which restore the
+    originals.
+    """
+    config = ClaudeConfig(
+        binary="claude",
+        timeout=60,
+        yolo=True,
+        projects={},
+    )
+    return ClaudeRunner(config)
+
+
+@pytest.fixture(scope="session")
+def mock_card():
+    """Shared TrelloCard for runner tests; never mutated."""
+    return TrelloCard(
+        id="card123",
+        name="test card",
+        description="test description",
+        url="https://trello.com/c/test",
+        last_activity="2026-01-01T00:00:00Z",
+    )
+
+
+@pytest.fixture(scope="session")
+def stats_card():
+    """Shared ``testproject /stats`` command card; never mutated."""
+    return TrelloCard(
+        id="stats-card-123",
+        name="testproject /stats",
+        url="https://trello.com/c/test",
+        description="",
+        last_activity="2026-01-24T10:00:00Z",
+    )
+
+
+@pytest.fixture(scope="session")
+def utc_now():
+    """One aware "now" for the whole run, for building relative reset times.
+
+    Offsets built from it (minutes to days) stay on the same side of the
+    real clock for any realistic test-run length.
+    """
+    return datetime.now(timezone.utc)
+
+
+class FakeTrello:
+    """Minimal stand-in for TrelloClient that records the calls made on it."""
+
+    def __init__(self):
+        self.comments: list[tuple[str, str]] = []
+        self.moved_to_ready: list[str] = []
+
+    async def add_comment(self, card_id: str, text: str) -> None:
+        self.comments.append((card_id, text))
+
+    async def move_to_ready(self, card_id: str) -> None:
+        self.moved_to_ready.append(card_id)
+
+
+# Raised by FailingTrello; built once and re-raised rather than per call.
+_API_ERROR = RuntimeError("API error")
+
+
+class FailingTrello(FakeTrello):
+    """FakeTrello whose add_comment fails like a Trello API error."""
+
+    async def add_comment(self, card_id: str, text: str) -> None:
+        raise _API_ERROR
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """Make ``asyncio.sleep`` return immediately; yields the requested delays.
+
+    A plain coroutine function rather than a Mock, so awaiting it costs no
+    more than any other no-op coroutine.
+    """
+    delays = []
+
+    async def fake_sleep(delay, result=None):
+        delays.append(delay)
+        return result
+
+    monkeypatch.setattr("asyncio.sleep", fake_sleep)
+    return delays
+
+
+@pytest.fixture
+def trello():
+    """Fresh FakeTrello per test."""
+    return FakeTrello()
+
+
+@pytest.fixture
+def failing_trello():
+    """Fresh FailingTrello per test."""
+    return FailingTrello()
+
+
+@pytest.fixture
+def state():
+    """Fresh in-memory StateManager; nothing is written to disk."""
+    return StateManager()
+
+
+@pytest.fixture
+def make_state_manager(tmp_path):
+    """Factory for file-backed StateManagers sharing one ``tmp_path`` state file.
+
+    ``initial`` is written to the file first, for tests that load a given
+    on-disk state. Calling the factory again reopens the same file, which is
+    how persistence tests check what was saved.
+    """
+
+    def make(initial: str | None = None) -> StateManager:
+        state_file = tmp_path / "state.json"
+        if initial is not None:
+            state_file.write_text(initial)
+        return StateManager(str(state_file))
+
+    return make
+
+
+@pytest.fixture(params=[1, 10, 1000], ids=lambda n: f"{n}-cards")
+def seeded_state(request, state):
+    """``state`` with N ``testproject`` cards recorded at seeded-random costs.
+
+    The seed is fixed, so every run records the same costs; the 1000-card
+    case keeps stats reporting honest at a realistic history size.
+    """
+    rng = random.Random(0)
+    for i in range(request.param):
+        state.record_cost(
+            card_id=f"card-{i}",
+            project="testproject",
+            total_cost=f"${rng.uniform(0.5, 10):.2f}",
+        )
+    return state
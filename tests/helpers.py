@@ -0,0 +1,15 @@
+"""Plain helpers shared by several test modules.
+
+Fixtures belong in conftest.py; this module holds ordinary functions that
+test modules import directly.
+"""
+
+from functools import lru_cache
+
+from trellm.config import MaintenanceConfig
+
+
+@lru_cache(maxsize=None)
+def maint_config(enabled: bool, interval: int) -> MaintenanceConfig:
+    """Shared MaintenanceConfig per (enabled, interval); tests never mutate it."""
+    return MaintenanceConfig(enabled=enabled, interval=interval)
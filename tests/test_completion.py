@@ -173,7 +173,6 @@ class TestSignalWatcher:
     stale entry from a previous card is never mistaken for completion.
     """
 
-    @pytest.mark.asyncio
     async def test_returns_entry_appended_after_construction(self, tmp_path):
         sig = tmp_path / "demo.signal"
         sig.write_text("stale-sess 2026-05-17T09:00:00Z\n")  # baseline
@@ -191,7 +190,6 @@ class TestSignalWatcher:
             session_id="new-sess", timestamp="2026-05-17T11:00:00Z"
         )
 
-    @pytest.mark.asyncio
     async def test_detects_entry_appended_before_wait_is_called(self, tmp_path):
         """The hook may fire before the caller gets to await — the entry
         must still be picked up by the up-front check."""
@@ -203,7 +201,6 @@ class TestSignalWatcher:
         entry = await watcher.wait(timeout=2)
         assert entry is not None and entry.session_id == "eager-sess"
 
-    @pytest.mark.asyncio
     async def test_ignores_stale_entry_present_at_construction(self, tmp_path):
         """An entry already in the file when the watcher is built is the
         baseline — it must not be returned as this card's completion."""
@@ -212,7 +209,6 @@ class TestSignalWatcher:
         watcher = SignalWatcher(sig, poll_interval=0.05, inotify_binary=NO_INOTIFY)
         assert await watcher.wait(timeout=0.3) is None
 
-    @pytest.mark.asyncio
     async def test_returns_none_when_no_signal_ever_appears(self, tmp_path):
         watcher = SignalWatcher(
             tmp_path / "absent.signal", poll_interval=0.05, inotify_binary=NO_INOTIFY
@@ -232,7 +228,6 @@ class TestSignalWatcher:
     @pytest.mark.skipif(
         shutil.which("inotifywait") is None, reason="inotify-tools not installed"
     )
-    @pytest.mark.asyncio
     async def test_wait_works_over_real_inotify_backend(self, tmp_path):
         """With polling effectively disabled (30s interval) and a 5s
         deadline, only the event-driven inotify backend can catch a
@@ -345,7 +340,6 @@ class TestDetectCompletion:
     """The assembled §4 confirmation stack: wait for the Stop signal
     (bounded by the timeout), then confirm the sentinel in the transcript."""
 
-    @pytest.mark.asyncio
     async def test_completed_when_signal_fires_and_sentinel_present(self, tmp_path):
         sig = tmp_path / "demo.signal"
         sig.write_text("")
@@ -371,7 +365,6 @@ class TestDetectCompletion:
         assert result.tokens["input_tokens"] == 1200
         assert result.tokens["output_tokens"] == 340
 
-    @pytest.mark.asyncio
     async def test_stopped_early_when_signal_fires_but_sentinel_absent(self, tmp_path):
         """Stop fires when a turn ends to ask a question, too — no sentinel
         means the turn stopped early, not that the task is done."""
@@ -394,7 +387,6 @@ class TestDetectCompletion:
         assert result.completed is False
         assert result.session_id == "sess-2"
 
-    @pytest.mark.asyncio
     async def test_timed_out_when_no_signal_within_budget(self, tmp_path):
         """The wall-clock timeout is the backstop — no Stop signal in
         budget yields TIMED_OUT and no session id."""
@@ -436,6 +428,7 @@ class TestStopHookScriptStructure:
         assert result.returncode == 0, f"bash -n failed: {result.stderr}"
 
 
+@pytest.mark.slow
 class TestStopHookScriptBehaviour:
     """The Stop hook script run for real: feed it canned hook JSON on
     stdin and assert the signal-file line it appends."""
@@ -6,7 +6,6 @@ import tempfile
 from pathlib import Path
 
 import pytest
-import yaml
 
 from trellm.config import (
     BrowserConfig,
@@ -24,6 +23,33 @@ from trellm.__main__ import (
 )
 
 
+# Static fixture files, written verbatim rather than rendered with yaml.dump
+_FILE_CONFIG_YAML = """\
+trello:
+  api_key: file-key
+  api_token: file-token
+  board_id: file-board
+  todo_list_id: file-list
+polling:
+  interval_seconds: 10
+claude:
+  binary: /usr/bin/claude
+  projects:
+    myproject:
+      working_dir: ~/src/myproject
+      session_id: abc123
+      compact_prompt: Preserve API patterns
+"""
+
+_TRELLO_ONLY_YAML = """\
+trello:
+  api_key: file-key
+  api_token: file-token
+  board_id: file-board
+  todo_list_id: file-list
+"""
+
+
 class TestLoadConfig:
     """Tests for load_config function."""
 
@@ -43,30 +69,8 @@ class TestLoadConfig:
 
     def test_load_from_file(self, tmp_path):
         """Test loading config from YAML file."""
-        config_data = {
-            "trello": {
-                "api_key": "file-key",
-                "api_token": "file-token",
-                "board_id": "file-board",
-                "todo_list_id": "file-list",
-            },
-            "polling": {
-                "interval_seconds": 10,
-            },
-            "claude": {
-                "binary": "/usr/bin/claude",
-                "projects": {
-                    "myproject": {
-                        "working_dir": "~/src/myproject",
-                        "session_id": "abc123",
-                        "compact_prompt": "Preserve API patterns",
-                    }
-                },
-            },
-        }
-
         config_file = tmp_path / "config.yaml"
-        config_file.write_text(yaml.dump(config_data))
+        config_file.write_text(_FILE_CONFIG_YAML)
 
         config = load_config(str(config_file))
 
@@ -79,17 +83,8 @@ class TestLoadConfig:
 
     def test_env_vars_override_file(self, tmp_path, monkeypatch):
         """Test that environment variables override file values."""
-        config_data = {
-            "trello": {
-                "api_key": "file-key",
-                "api_token": "file-token",
-                "board_id": "file-board",
-                "todo_list_id": "file-list",
-            },
-        }
-
         config_file = tmp_path / "config.yaml"
-        config_file.write_text(yaml.dump(config_data))
+        config_file.write_text(_TRELLO_ONLY_YAML)
 
         monkeypatch.setenv("TRELLO_API_KEY", "env-key")
 
@@ -100,6 +95,32 @@ class TestLoadConfig:
         # File value should be used
         assert config.trello.api_token == "file-token"
 
+    def test_reload_picks_up_edited_file(self, tmp_path):
+        """Test that a cached parse is dropped once the file changes."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("polling:\n  interval_seconds: 10\n")
+        assert load_config(str(config_file)).poll_interval == 10
+
+        config_file.write_text("polling:\n  interval_seconds: 300\n")
+        # Pin a different mtime in case both writes land in one clock tick
+        st = config_file.stat()
+        os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+        assert load_config(str(config_file)).poll_interval == 300
+
+    def test_repeat_loads_do_not_share_mutable_values(self, tmp_path):
+        """Test that configs from a cached parse don't alias each other."""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "claude:\n  projects:\n    myproject:\n      aliases: [mp]\n"
+        )
+
+        first = load_config(str(config_file))
+        first.claude.projects["myproject"].aliases.append("changed")
+        second = load_config(str(config_file))
+
+        assert second.claude.projects["myproject"].aliases == ["mp"]
+
     def test_default_values(self):
         """Test default configuration values."""
         config = load_config("/nonexistent/path")
@@ -115,8 +136,6 @@ class TestConfig:
 
     def test_get_working_dir(self):
         """Test get_working_dir method."""
-        from trellm.config import TrelloConfig, ClaudeConfig
-
         config = Config(
             trello=TrelloConfig(
                 api_key="",
@@ -136,8 +155,6 @@ class TestConfig:
 
     def test_get_initial_session_id(self):
         """Test get_initial_session_id method."""
-        from trellm.config import TrelloConfig, ClaudeConfig
-
         config = Config(
             trello=TrelloConfig(
                 api_key="",
@@ -160,8 +177,6 @@ class TestConfig:
 
     def test_get_compact_prompt(self):
         """Test get_compact_prompt method."""
-        from trellm.config import TrelloConfig, ClaudeConfig
-
         config = Config(
             trello=TrelloConfig(
                 api_key="",
@@ -302,25 +317,16 @@ class TestLoadConfigWithAliases:
 
     def test_load_aliases_from_file(self, tmp_path):
         """Test loading project aliases from YAML config."""
-        config_data = {
-            "trello": {
-                "api_key": "key",
-                "api_token": "token",
-                "board_id": "board",
-                "todo_list_id": "list",
-            },
-            "claude": {
-                "projects": {
-                    "smugcoin": {
-                        "working_dir": "~/src/smugcoin",
-                        "aliases": ["smg", "sc"],
-                    }
-                },
-            },
-        }
+        config_yaml = _TRELLO_ONLY_YAML + (
+            "claude:\n"
+            "  projects:\n"
+            "    smugcoin:\n"
+            "      working_dir: ~/src/smugcoin\n"
+            "      aliases: [smg, sc]\n"
+        )
 
         config_file = tmp_path / "config.yaml"
-        config_file.write_text(yaml.dump(config_data))
+        config_file.write_text(config_yaml)
 
         config = load_config(str(config_file))
 
@@ -331,24 +337,15 @@ class TestLoadConfigWithAliases:
 
     def test_load_no_aliases_defaults_empty(self, tmp_path):
         """Test that missing aliases defaults to empty list."""
-        config_data = {
-            "trello": {
-                "api_key": "key",
-                "api_token": "token",
-                "board_id": "board",
-                "todo_list_id": "list",
-            },
-            "claude": {
-                "projects": {
-                    "myproject": {
-                        "working_dir": "~/src/myproject",
-                    }
-                },
-            },
-        }
+        config_yaml = _TRELLO_ONLY_YAML + (
+            "claude:\n"
+            "  projects:\n"
+            "    myproject:\n"
+            "      working_dir: ~/src/myproject\n"
+        )
 
         config_file = tmp_path / "config.yaml"
-        config_file.write_text(yaml.dump(config_data))
+        config_file.write_text(config_yaml)
 
         config = load_config(str(config_file))
 
@@ -615,6 +612,70 @@ class TestConfigComparison:
         changes = compare_configs(config1, config2)
         assert any("proj1.runner" in c for c in changes)
 
+    def test_configs_equal_ignores_credentials(self):
+        """Credential changes are not reported, since the change list is
+        posted as a Trello comment."""
+        config1 = self._make_config()
+        config2 = self._make_config(
+            trello=TrelloConfig(
+                api_key="new-key",
+                api_token="new-token",
+                board_id="board",
+                todo_list_id="todo",
+                ready_to_try_list_id="ready",
+            )
+        )
+
+        assert configs_equal(config1, config2)
+        assert compare_configs(config1, config2) == []
+
+    def test_configs_equal_alias_order_ignored(self):
+        """Reordering aliases is not a change."""
+        config1 = self._make_config(
+            claude=ClaudeConfig(
+                projects={"proj1": ProjectConfig(
+                    working_dir="~/src/proj1", aliases=["a", "b"],
+                )},
+            )
+        )
+        config2 = self._make_config(
+            claude=ClaudeConfig(
+                projects={"proj1": ProjectConfig(
+                    working_dir="~/src/proj1", aliases=["b", "a"],
+                )},
+            )
+        )
+
+        assert configs_equal(config1, config2)
+
+    def test_compare_configs_order_and_alias_format(self):
+        """Trello changes come last and aliases are shown as written."""
+        config1 = self._make_config(poll_interval=5)
+        config2 = self._make_config(
+            poll_interval=10,
+            trello=TrelloConfig(
+                api_key="key",
+                api_token="token",
+                board_id="board",
+                todo_list_id="todo",
+                ready_to_try_list_id="ready2",
+            ),
+            claude=ClaudeConfig(
+                binary="claude",
+                timeout=600,
+                yolo=False,
+                projects={"proj1": ProjectConfig(
+                    working_dir="~/src/proj1", aliases=["zz", "aa"],
+                )},
+            ),
+        )
+
+        assert compare_configs(config1, config2) == [
+            "poll_interval: 5 → 10",
+            "proj1.aliases: [] → ['zz', 'aa']",
+            "ready_to_try_list_id: ready → ready2",
+        ]
+
 
 class TestGetRunnerMode:
     """Tests for Config.get_runner_mode.
@@ -673,18 +734,14 @@ class TestGetRunnerMode:
         """Global and per-project `runner` parse from the yaml config."""
         config_path = tmp_path / "config.yaml"
         config_path.write_text(
-            yaml.dump({
-                "claude": {
-                    "runner": "print",
-                    "projects": {
-                        "itest": {
-                            "working_dir": "~/src/itest",
-                            "runner": "interactive",
-                        },
-                        "other": {"working_dir": "~/src/other"},
-                    },
-                },
-            })
+            "claude:\n"
+            "  runner: print\n"
+            "  projects:\n"
+            "    itest:\n"
+            "      working_dir: ~/src/itest\n"
+            "      runner: interactive\n"
+            "    other:\n"
+            "      working_dir: ~/src/other\n"
         )
 
         config = load_config(str(config_path))
@@ -699,11 +756,10 @@ class TestGetRunnerMode:
         print and leaves per-project overrides unset."""
         config_path = tmp_path / "config.yaml"
         config_path.write_text(
-            yaml.dump({
-                "claude": {
-                    "projects": {"other": {"working_dir": "~/src/other"}},
-                },
-            })
+            "claude:\n"
+            "  projects:\n"
+            "    other:\n"
+            "      working_dir: ~/src/other\n"
         )
 
         config = load_config(str(config_path))
@@ -760,18 +816,14 @@ class TestGetTimeout:
         """Per-project `timeout` parses from the yaml config."""
         config_path = tmp_path / "config.yaml"
         config_path.write_text(
-            yaml.dump({
-                "claude": {
-                    "timeout": 1200,
-                    "projects": {
-                        "smugcoin": {
-                            "working_dir": "~/src/smugcoin",
-                            "timeout": 1800,
-                        },
-                        "other": {"working_dir": "~/src/other"},
-                    },
-                },
-            })
+            "claude:\n"
+            "  timeout: 1200\n"
+            "  projects:\n"
+            "    smugcoin:\n"
+            "      working_dir: ~/src/smugcoin\n"
+            "      timeout: 1800\n"
+            "    other:\n"
+            "      working_dir: ~/src/other\n"
         )
 
         config = load_config(str(config_path))
@@ -830,40 +882,32 @@ class TestBrowserConfig:
         assert BrowserConfig().enabled is False
 
     def test_global_browser_config_loaded_from_yaml(self, tmp_path):
-        config_data = {
-            "trello": {
-                "api_key": "k", "api_token": "t",
-                "board_id": "b", "todo_list_id": "l",
-            },
-            "claude": {
-                "browser": {"enabled": True},
-                "projects": {"p1": {"working_dir": "~/src/p1"}},
-            },
-        }
+        config_yaml = _TRELLO_ONLY_YAML + (
+            "claude:\n"
+            "  browser:\n"
+            "    enabled: true\n"
+            "  projects:\n"
+            "    p1:\n"
+            "      working_dir: ~/src/p1\n"
+        )
         config_file = tmp_path / "config.yaml"
-        config_file.write_text(yaml.dump(config_data))
+        config_file.write_text(config_yaml)
 
         config = load_config(str(config_file))
         assert config.claude.browser is not None
         assert config.claude.browser.enabled is True
 
     def test_project_browser_config_loaded_from_yaml(self, tmp_path):
-        config_data = {
-            "trello": {
-                "api_key": "k", "api_token": "t",
-                "board_id": "b", "todo_list_id": "l",
-            },
-            "claude": {
-                "projects": {
-                    "p1": {
-                        "working_dir": "~/src/p1",
-                        "browser": {"enabled": True},
-                    }
-                },
-            },
-        }
+        config_yaml = _TRELLO_ONLY_YAML + (
+            "claude:\n"
+            "  projects:\n"
+            "    p1:\n"
+            "      working_dir: ~/src/p1\n"
+            "      browser:\n"
+            "        enabled: true\n"
+        )
         config_file = tmp_path / "config.yaml"
-        config_file.write_text(yaml.dump(config_data))
+        config_file.write_text(config_yaml)
 
         config = load_config(str(config_file))
         proj = config.claude.projects["p1"]
@@ -873,17 +917,14 @@ class TestBrowserConfig:
     def test_missing_browser_block_yields_none(self, tmp_path):
         """No `browser:` block in yaml leaves the field as None at both
         levels — distinguishes 'not set' from 'set to false'."""
-        config_data = {
-            "trello": {
-                "api_key": "k", "api_token": "t",
-                "board_id": "b", "todo_list_id": "l",
-            },
-            "claude": {
-                "projects": {"p1": {"working_dir": "~/src/p1"}},
-            },
-        }
+        config_yaml = _TRELLO_ONLY_YAML + (
+            "claude:\n"
+            "  projects:\n"
+            "    p1:\n"
+            "      working_dir: ~/src/p1\n"
+        )
         config_file = tmp_path / "config.yaml"
-        config_file.write_text(yaml.dump(config_data))
+        config_file.write_text(config_yaml)
 
         config = load_config(str(config_file))
         assert config.claude.browser is None
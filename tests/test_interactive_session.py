@@ -152,7 +152,6 @@ class TestPaneDelta:
 class TestWindowLifecycle:
     """§6.1 — create on first card, reuse a live window on restart."""
 
-    @pytest.mark.asyncio
     async def test_first_card_creates_session_and_window(self, tmp_path):
         tmux = _tmux(windows=[])
         session = _session(tmp_path, tmux=tmux)
@@ -165,7 +164,6 @@ class TestWindowLifecycle:
         tmux.create_window.assert_awaited_once()
         assert tmux.create_window.await_args.args[0] == "demo"
 
-    @pytest.mark.asyncio
     async def test_window_command_has_continue_with_fallback(self, tmp_path):
         """§6.1: the window runs `claude --continue ... || claude ...` so it
         resumes the prior session, falling back to a fresh one first-ever."""
@@ -180,7 +178,6 @@ class TestWindowLifecycle:
         assert "claude --continue --dangerously-skip-permissions" in command
         assert "|| claude --dangerously-skip-permissions" in command
 
-    @pytest.mark.asyncio
     async def test_existing_window_is_reused(self, tmp_path):
         """Restart path: a live window for the project is reused, not
         recreated, so in-flight context survives."""
@@ -197,7 +194,6 @@ class TestWindowLifecycle:
 class TestPreCompact:
     """§6.1 — `/compact` is dispatched as its own turn between cards."""
 
-    @pytest.mark.asyncio
     async def test_compact_dispatched_between_different_cards(self, tmp_path):
         state = StateManager(str(tmp_path / "state.json"))
         state.set_session("demo", "old-sess", last_card_id="prev-card")
@@ -211,7 +207,6 @@ class TestPreCompact:
         literals = [c.args[1] for c in tmux.send_literal.await_args_list]
         assert "/compact" in literals
 
-    @pytest.mark.asyncio
     async def test_no_compact_on_first_card(self, tmp_path):
         """No prior card ⇒ nothing to compact."""
         tmux = _tmux(windows=["demo"])
@@ -224,7 +219,6 @@ class TestPreCompact:
         literals = [c.args[1] for c in tmux.send_literal.await_args_list]
         assert "/compact" not in literals
 
-    @pytest.mark.asyncio
     async def test_no_compact_when_retrying_same_card(self, tmp_path):
         """A retry of the SAME card must keep its context — no `/compact`."""
         state = StateManager(str(tmp_path / "state.json"))
@@ -243,7 +237,6 @@ class TestPreCompact:
 class TestTaskDispatch:
     """§6.1/§8 — prompt written to a file, dispatched via send-keys."""
 
-    @pytest.mark.asyncio
     async def test_task_file_written_with_sentinel(self, tmp_path):
         tmux = _tmux(windows=["demo"])
         session = _session(tmp_path, tmux=tmux)
@@ -258,7 +251,6 @@ class TestTaskDispatch:
         assert sentinel_marker("card-1") in content
         assert "card-1" in content
 
-    @pytest.mark.asyncio
     async def test_dispatch_types_read_instruction_then_enter(self, tmp_path):
         """The one-line instruction is typed literally, then submitted with
         a SEPARATE Enter — never a multiline prompt typed directly."""
@@ -280,7 +272,6 @@ class TestTaskDispatch:
 class TestCompletionOutcomes:
     """§4 confirmation stack — each outcome to its result / exception."""
 
-    @pytest.mark.asyncio
     async def test_completed_returns_success_result(self, tmp_path):
         session = _session(tmp_path, windows=["demo"])
         completion = _completion(
@@ -296,7 +287,6 @@ class TestCompletionOutcomes:
         assert result.session_id == "post-compact-sess"
         assert result.summary == "shipped the feature"
 
-    @pytest.mark.asyncio
     async def test_completed_carries_tokens_in_cost_info(self, tmp_path):
         session = _session(tmp_path, windows=["demo"])
         completion = _completion(
@@ -316,7 +306,6 @@ class TestCompletionOutcomes:
         assert result.cost_info.cache_creation_tokens == 33
         assert result.cost_info.cache_read_tokens == 44
 
-    @pytest.mark.asyncio
     async def test_completed_persists_session_id_and_card(self, tmp_path):
         state = StateManager(str(tmp_path / "state.json"))
         session = _session(tmp_path, windows=["demo"], state=state)
@@ -326,7 +315,6 @@ class TestCompletionOutcomes:
         assert state.get_session("demo") == "new-sess"
         assert state.get_last_card_id("demo") == "card-1"
 
-    @pytest.mark.asyncio
     async def test_timed_out_raises_and_interrupts_pane(self, tmp_path):
         tmux = _tmux(windows=["demo"])
         session = _session(tmp_path, tmux=tmux)
@@ -339,7 +327,6 @@ class TestCompletionOutcomes:
         assert ("Escape",) in sent
         assert ("C-c",) in sent
 
-    @pytest.mark.asyncio
     async def test_stopped_early_clean_transcript_raises_runtimeerror(self, tmp_path):
         """STOPPED_EARLY with no error pattern in the transcript ⇒ a plain
         failure: the card stays in TODO with a retry-context comment, as in
@@ -355,7 +342,6 @@ class TestCompletionOutcomes:
                 await session.run_task(_card(), timeout=60)
         assert not isinstance(exc.value, (MonthlyLimitError, RateLimitError))
 
-    @pytest.mark.asyncio
     async def test_stopped_early_persists_session_id_before_raising(self, tmp_path):
         """Even a failed turn advanced the live window's session — persist
         the id so a restart resumes the right session."""
@@ -381,7 +367,6 @@ class TestErrorDetectionOverTranscript:
     stderr must not lose rate-limit / monthly-limit detection — that is what
     pauses the global polling loop."""
 
-    @pytest.mark.asyncio
     async def test_monthly_limit_in_transcript_raises_monthly_limit_error(
         self, tmp_path
     ):
@@ -402,7 +387,6 @@ class TestErrorDetectionOverTranscript:
             with pytest.raises(MonthlyLimitError):
                 await session.run_task(_card(), timeout=60)
 
-    @pytest.mark.asyncio
     async def test_rate_limit_in_transcript_raises_rate_limit_error(self, tmp_path):
         session = _session(tmp_path, windows=["demo"])
         transcript = tmp_path / "sess.jsonl"
@@ -421,7 +405,6 @@ class TestErrorDetectionOverTranscript:
 class TestPaneStreaming:
     """§6.3 — output_callback fed by a periodic capture-pane diff."""
 
-    @pytest.mark.asyncio
     async def test_output_callback_receives_pane_text(self, tmp_path):
         tmux = _tmux(windows=["demo"])
         tmux.capture_pane = AsyncMock(return_value="claude is working...")
@@ -437,7 +420,6 @@ class TestPaneStreaming:
             )
         assert "claude is working..." in received
 
-    @pytest.mark.asyncio
     async def test_no_pane_capture_without_callback(self, tmp_path):
         """With no output_callback there is no dashboard consumer — the
         capture-pane poll must not run."""
@@ -1,5 +1,9 @@
 """Tests for __main__ module."""
 
+import asyncio
+import sys
+from dataclasses import replace
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -16,6 +20,7 @@ from trellm.__main__ import (
     handle_abort_command,
     handle_restart_command,
     RestartRequested,
+    _run_event_loop,
 )
 from trellm.config import (
     Config,
@@ -29,306 +34,250 @@ from trellm.session import SessionManager
 from trellm.trello import TrelloCard
 
 
-class TestParseProject:
-    """Tests for parse_project function."""
+@pytest.fixture(autouse=True)
+def _no_sleep(no_sleep):
+    """Keep any sleep on a handler's path (retries, backoff) off the clock."""
 
-    def test_parse_simple_project(self):
-        """Test parsing simple project name."""
-        assert parse_project("myproject Add new feature") == "myproject"
-
-    def test_parse_project_with_colon(self):
-        """Test parsing project name with colon."""
-        assert parse_project("myproject: Add new feature") == "myproject"
-
-    def test_parse_project_uppercase(self):
-        """Test that project names are lowercased."""
-        assert parse_project("MyProject: Add feature") == "myproject"
-
-    def test_parse_empty_name(self):
-        """Test parsing empty card name."""
-        assert parse_project("") == "unknown"
-
-
-class TestIsStatsCommand:
-    """Tests for is_stats_command function."""
-
-    def test_stats_command_basic(self):
-        """Test basic /stats command detection."""
-        assert is_stats_command("project /stats")
-        assert is_stats_command("trellm /stats")
-
-    def test_stats_command_with_colon(self):
-        """Test /stats with project colon format."""
-        assert is_stats_command("project: /stats")
-
-    def test_stats_command_case_insensitive(self):
-        """Test /stats is case insensitive."""
-        assert is_stats_command("project /STATS")
-        assert is_stats_command("project /Stats")
-
-    def test_not_stats_command(self):
-        """Test regular cards are not detected as /stats."""
-        assert not is_stats_command("project Add stats feature")
-        assert not is_stats_command("trellm Fix bug")
-        assert not is_stats_command("project / stats")  # space breaks command
-
-    def test_stats_not_after_project_name(self):
-        """Test /stats must appear immediately after project name."""
-        # /stats appearing later in the card name should NOT match
-        assert not is_stats_command("trellm problem with the /stats command")
-        assert not is_stats_command("project fix /stats display")
-        assert not is_stats_command("myapp bug in /stats feature")
-
-    def test_stats_with_valid_projects_filter(self):
-        """Test /stats with valid_projects filter."""
-        valid = {"trellm", "myapp"}
-        # Should match when project is in valid set
-        assert is_stats_command("trellm /stats", valid)
-        assert is_stats_command("myapp /stats", valid)
-        # Should NOT match when project is not in valid set
-        assert not is_stats_command("otherproject /stats", valid)
-        assert not is_stats_command("unknown /stats", valid)
-
-    def test_stats_single_word_not_matched(self):
-        """Test that single word cards are not matched."""
-        assert not is_stats_command("/stats")
-        assert not is_stats_command("project")
 
-    def test_stats_with_alias_in_valid_projects(self):
-        """Test /stats with aliases included in valid_projects set."""
-        # Aliases should be included in the valid set via get_all_project_names()
-        valid = {"smugcoin", "smg", "myapp"}
-        assert is_stats_command("smg /stats", valid)
-        assert is_stats_command("smugcoin /stats", valid)
+# Command cards shared read-only across the handler tests; variants are
+# derived with dataclasses.replace() instead of spelling out every field.
+_BASE_CARD = TrelloCard(
+    id="card-123",
+    name="",
+    url="https://trello.com/c/test",
+    description="",
+    last_activity="2026-01-24T10:00:00Z",
+)
+_MAINT_CARD = replace(_BASE_CARD, id="maint-card-123", name="testproject /maintenance")
+_RESET_CARD = replace(_BASE_CARD, id="reset-card-123", name="testproject /reset-session")
+_ABORT_CARD = replace(_BASE_CARD, id="abort-card-123", name="trellm /abort")
+_RESTART_CARD = replace(_BASE_CARD, id="restart-card-123", name="trellm /restart")
 
+# valid_projects sets for the command-detection tables, shared by every row
+_VALID_PROJECTS = frozenset({"trellm", "myapp"})
+_VALID_WITH_ALIAS = frozenset({"smugcoin", "smg", "myapp"})
 
-class TestHandleStatsCommand:
-    """Tests for handle_stats_command function."""
 
-    @pytest.mark.asyncio
-    async def test_handle_stats_basic(self, tmp_path):
-        """Test handling a basic /stats command."""
-        from trellm.state import StateManager
+def _with_project(config: Config, name: str, **project_fields) -> Config:
+    """Copy ``config`` with its projects replaced by a single project."""
+    return replace(
+        config,
+        claude=replace(config.claude, projects={name: ProjectConfig(**project_fields)}),
+    )
 
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
 
-        # Record some test data
-        state.record_cost(
-            card_id="test-card",
-            project="testproject",
-            total_cost="$5.00",
-        )
+def _assert_comment(trello, *needles: str, card_id: str | None = None) -> None:
+    """Assert ``trello`` got exactly one comment, containing every needle."""
+    assert len(trello.comments) == 1, trello.comments
+    comment_card_id, body = trello.comments[0]
+    if card_id is not None:
+        assert comment_card_id == card_id
+    for needle in needles:
+        assert needle in body, (needle, body)
 
-        # Create mock card and trello client
-        card = TrelloCard(
-            id="stats-card-123",
-            name="testproject /stats",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
 
-        trello = MagicMock()
-        trello.add_comment = AsyncMock()
-        trello.move_to_ready = AsyncMock()
+@pytest.fixture(scope="module")
+def handler_config() -> Config:
+    """Config with one maintenance-enabled ``testproject``.
 
-        result = await handle_stats_command(
-            card=card,
-            trello=trello,
-            state=state,
-        )
+    Built once per module; the command handlers only read it, and tests
+    that need a variant derive one with ``_with_project``.
+    """
+    return Config(
+        trello=TrelloConfig(
+            api_key="key",
+            api_token="token",
+            board_id="board",
+            todo_list_id="todo",
+            ready_to_try_list_id="ready",
+            icebox_list_id="icebox",
+        ),
+        claude=ClaudeConfig(
+            binary="claude",
+            timeout=60,
+            projects={
+                "testproject": ProjectConfig(
+                    working_dir="/tmp/testproject",
+                    maintenance=MaintenanceConfig(enabled=True, interval=10),
+                )
+            },
+        ),
+    )
 
-        assert result is True
-        trello.add_comment.assert_called_once()
-        trello.move_to_ready.assert_called_once_with("stats-card-123")
 
-        # Check comment contains stats
-        comment_arg = trello.add_comment.call_args[0][1]
-        assert "/stats command processed" in comment_arg
-        assert "$5.00" in comment_arg
+@pytest.fixture(scope="module")
+def alias_config(handler_config) -> Config:
+    """``handler_config`` with ``smugcoin`` (alias ``smg``) as its project."""
+    return _with_project(
+        handler_config,
+        "smugcoin",
+        working_dir="/tmp/smugcoin",
+        aliases=["smg"],
+        maintenance=MaintenanceConfig(enabled=True, interval=10),
+    )
 
-    @pytest.mark.asyncio
-    async def test_handle_stats_error(self, tmp_path):
-        """Test handling /stats when trello call fails."""
-        from trellm.state import StateManager
 
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
+class TestParseProject:
+    """Tests for parse_project function."""
 
-        card = TrelloCard(
-            id="stats-card-123",
-            name="testproject /stats",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+    @pytest.mark.parametrize(
+        "card_name, expected",
+        [
+            ("myproject Add new feature", "myproject"),
+            ("myproject: Add new feature", "myproject"),
+            # Project names are lowercased
+            ("MyProject: Add feature", "myproject"),
+            ("", "unknown"),
+            ("   ", "unknown"),
+            # Card name that is only the project
+            ("trellm", "trellm"),
+            ("  trellm:\n", "trellm"),
+        ],
+    )
+    def test_parse_project(self, card_name, expected):
+        """Test extracting the project name from a card name."""
+        assert parse_project(card_name) == expected
+
+
+class TestIsProjectCommand:
+    """Tests for the per-project command checkers.
+
+    is_stats_command, is_maintenance_command and is_reset_session_command
+    share one grammar: ``<project>[:] /<command>``, with the command
+    immediately after the project name. Each row's card name is a template
+    filled in with the command under test.
+    """
 
-        trello = MagicMock()
-        trello.add_comment = AsyncMock(side_effect=Exception("API error"))
+    @pytest.mark.parametrize(
+        "checker, command",
+        [
+            (is_stats_command, "/stats"),
+            (is_maintenance_command, "/maintenance"),
+            (is_reset_session_command, "/reset-session"),
+        ],
+        ids=["stats", "maintenance", "reset-session"],
+    )
+    @pytest.mark.parametrize(
+        "template, valid_projects, expected",
+        [
+            ("project {cmd}", None, True),
+            ("trellm {cmd}", None, True),
+            ("project: {cmd}", None, True),
+            # Case insensitive
+            ("project {CMD}", None, True),
+            ("project {Cmd}", None, True),
+            # Anything after the command is ignored
+            ("project {cmd} please", None, True),
+            # Regular cards
+            ("project Add {word} feature", None, False),
+            ("trellm Fix bug", None, False),
+            ("project / {word}", None, False),  # space breaks command
+            # The command must appear immediately after the project name
+            ("trellm problem with the {cmd} command", None, False),
+            ("project fix {cmd} display", None, False),
+            ("myapp bug in {cmd} feature", None, False),
+            # Single word cards
+            ("{cmd}", None, False),
+            ("project", None, False),
+            # valid_projects filter
+            ("trellm {cmd}", _VALID_PROJECTS, True),
+            ("myapp {cmd}", _VALID_PROJECTS, True),
+            ("otherproject {cmd}", _VALID_PROJECTS, False),
+            ("unknown {cmd}", _VALID_PROJECTS, False),
+            # Aliases are included in the valid set via get_all_project_names()
+            ("smg {cmd}", _VALID_WITH_ALIAS, True),
+            ("smugcoin {cmd}", _VALID_WITH_ALIAS, True),
+        ],
+    )
+    def test_detection(self, checker, command, template, valid_projects, expected):
+        """Test command detection for each checker."""
+        card_name = template.format(
+            cmd=command, CMD=command.upper(), Cmd=command.title(), word=command[1:],
+        )
+        assert checker(card_name, valid_projects) is expected
 
-        result = await handle_stats_command(
-            card=card,
-            trello=trello,
-            state=state,
-        )
 
-        assert result is False
-
-
-class TestIsMaintenanceCommand:
-    """Tests for is_maintenance_command function."""
-
-    def test_maintenance_command_basic(self):
-        """Test basic /maintenance command detection."""
-        assert is_maintenance_command("project /maintenance")
-        assert is_maintenance_command("trellm /maintenance")
-        assert is_maintenance_command("sus /maintenance")
-
-    def test_maintenance_command_with_colon(self):
-        """Test /maintenance with project colon format."""
-        assert is_maintenance_command("project: /maintenance")
-
-    def test_maintenance_command_case_insensitive(self):
-        """Test /maintenance is case insensitive."""
-        assert is_maintenance_command("project /MAINTENANCE")
-        assert is_maintenance_command("project /Maintenance")
-
-    def test_not_maintenance_command(self):
-        """Test regular cards are not detected as /maintenance."""
-        assert not is_maintenance_command("project Add maintenance feature")
-        assert not is_maintenance_command("trellm Fix bug")
-        assert not is_maintenance_command("project / maintenance")  # space breaks command
-
-    def test_maintenance_not_after_project_name(self):
-        """Test /maintenance must appear immediately after project name."""
-        # /maintenance appearing later in the card name should NOT match
-        assert not is_maintenance_command("trellm problem with the /maintenance command")
-        assert not is_maintenance_command("project fix /maintenance display")
-        assert not is_maintenance_command("myapp bug in /maintenance feature")
-
-    def test_maintenance_with_valid_projects_filter(self):
-        """Test /maintenance with valid_projects filter."""
-        valid = {"trellm", "myapp", "sus"}
-        # Should match when project is in valid set
-        assert is_maintenance_command("trellm /maintenance", valid)
-        assert is_maintenance_command("myapp /maintenance", valid)
-        assert is_maintenance_command("sus /maintenance", valid)
-        # Should NOT match when project is not in valid set
-        assert not is_maintenance_command("otherproject /maintenance", valid)
-        assert not is_maintenance_command("unknown /maintenance", valid)
-
-    def test_maintenance_single_word_not_matched(self):
-        """Test that single word cards are not matched."""
-        assert not is_maintenance_command("/maintenance")
-        assert not is_maintenance_command("project")
+class TestHandleStatsCommand:
+    """Tests for handle_stats_command function."""
 
-    def test_maintenance_with_alias_in_valid_projects(self):
-        """Test /maintenance with aliases included in valid_projects set."""
-        valid = {"smugcoin", "smg", "myapp"}
-        assert is_maintenance_command("smg /maintenance", valid)
-        assert is_maintenance_command("smugcoin /maintenance", valid)
+    @pytest.mark.parametrize(
+        "trello_fixture, expected",
+        [("trello", True), ("failing_trello", False)],
+        ids=["ok", "comment-fails"],
+    )
+    async def test_handle_stats(
+        self, request, seeded_state, stats_card, trello_fixture, expected,
+    ):
+        """Test handling a /stats command, and a Trello failure while posting it."""
+        trello = request.getfixturevalue(trello_fixture)
+
+        result = await handle_stats_command(
+            card=stats_card,
+            trello=trello,
+            state=seeded_state,
+        )
+
+        assert result is expected
+        if not expected:
+            assert trello.moved_to_ready == []
+        else:
+            assert trello.moved_to_ready == ["stats-card-123"]
+
+            # Check comment contains stats
+            stats = seeded_state.get_stats()
+            _assert_comment(
+                trello,
+                "/stats command processed",
+                f"**Total Cost:** {stats.total_cost_dollars}",
+                f"**Total Tickets:** {stats.total_tickets}",
+                card_id="stats-card-123",
+            )
 
 
 class TestHandleMaintenanceCommand:
     """Tests for handle_maintenance_command function."""
 
-    def _create_test_config(self, project: str = "testproject") -> Config:
-        """Create a test configuration."""
-        return Config(
-            trello=TrelloConfig(
-                api_key="key",
-                api_token="token",
-                board_id="board",
-                todo_list_id="todo",
-                ready_to_try_list_id="ready",
-                icebox_list_id="icebox",
-            ),
-            claude=ClaudeConfig(
-                binary="claude",
-                timeout=60,
-                projects={
-                    project: ProjectConfig(
-                        working_dir="/tmp/testproject",
-                        maintenance=MaintenanceConfig(enabled=True, interval=10),
-                    )
-                },
-            ),
-        )
+    @pytest.fixture
+    def run_maint(self, monkeypatch):
+        """Install a fake run_maintenance returning the given result.
 
-    @pytest.mark.asyncio
-    async def test_handle_maintenance_unknown_project(self, tmp_path):
-        """Test handling /maintenance for unknown project."""
-        from trellm.state import StateManager
+        Returns the list the fake appends each call's keyword arguments to.
+        """
+        def install(result: MaintenanceResult) -> list[dict]:
+            calls: list[dict] = []
 
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
-        config = self._create_test_config("otherproject")
+            async def fake_run_maintenance(**kwargs):
+                calls.append(kwargs)
+                return result
 
-        card = TrelloCard(
-            id="maint-card-123",
-            name="unknownproject /maintenance",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+            monkeypatch.setattr("trellm.__main__.run_maintenance", fake_run_maintenance)
+            return calls
 
-        trello = MagicMock()
-        trello.add_comment = AsyncMock()
-        trello.move_to_ready = AsyncMock()
+        return install
+
+    async def test_handle_maintenance_unknown_project(self, handler_config, trello, state):
+        """Test handling /maintenance for unknown project."""
+        card = replace(_MAINT_CARD, name="unknownproject /maintenance")
 
         result = await handle_maintenance_command(
             card=card,
             trello=trello,
             state=state,
-            config=config,
+            config=handler_config,
         )
 
         assert result is True  # Card handled, just with error
-        trello.add_comment.assert_called_once()
-        comment_arg = trello.add_comment.call_args[0][1]
-        assert "not found in configuration" in comment_arg
-        trello.move_to_ready.assert_called_once()
+        _assert_comment(trello, "not found in configuration")
+        assert len(trello.moved_to_ready) == 1
 
-    @pytest.mark.asyncio
-    async def test_handle_maintenance_no_maintenance_config(self, tmp_path):
+    async def test_handle_maintenance_no_maintenance_config(self, handler_config, trello, state):
         """Test handling /maintenance when maintenance not configured."""
-        from trellm.state import StateManager
-
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
-
         # Config without maintenance
-        config = Config(
-            trello=TrelloConfig(
-                api_key="key",
-                api_token="token",
-                board_id="board",
-                todo_list_id="todo",
-            ),
-            claude=ClaudeConfig(
-                binary="claude",
-                timeout=60,
-                projects={
-                    "testproject": ProjectConfig(
-                        working_dir="/tmp/testproject",
-                        # No maintenance config
-                    )
-                },
-            ),
+        config = _with_project(
+            handler_config, "testproject", working_dir="/tmp/testproject",
         )
 
-        card = TrelloCard(
-            id="maint-card-123",
-            name="testproject /maintenance",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
-
-        trello = MagicMock()
-        trello.add_comment = AsyncMock()
-        trello.move_to_ready = AsyncMock()
+        card = _MAINT_CARD
 
         result = await handle_maintenance_command(
             card=card,
@@ -338,35 +287,15 @@ class TestHandleMaintenanceCommand:
         )
 
         assert result is True
-        trello.add_comment.assert_called_once()
-        comment_arg = trello.add_comment.call_args[0][1]
-        assert "not configured" in comment_arg
+        _assert_comment(trello, "not configured")
 
-    @pytest.mark.asyncio
-    async def test_handle_maintenance_success(self, tmp_path):
+    async def test_handle_maintenance_success(self, handler_config, trello, state, run_maint):
         """Test successful /maintenance command."""
-        from trellm.state import StateManager
-
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
-        config = self._create_test_config("testproject")
-
         # Add some tickets to verify reset
-        state.add_processed_ticket("testproject", "card-1")
-        state.add_processed_ticket("testproject", "card-2")
+        state.bulk_load(tickets={"testproject": ["card-1", "card-2"]})
         assert state.get_ticket_count("testproject") == 2
 
-        card = TrelloCard(
-            id="maint-card-123",
-            name="testproject /maintenance",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
-
-        trello = MagicMock()
-        trello.add_comment = AsyncMock()
-        trello.move_to_ready = AsyncMock()
+        card = _MAINT_CARD
 
         mock_result = MaintenanceResult(
             success=True,
@@ -374,114 +303,52 @@ class TestHandleMaintenanceCommand:
             session_id="new-session-123",
         )
 
-        with patch("trellm.__main__.run_maintenance", return_value=mock_result) as mock_run:
-            result = await handle_maintenance_command(
-                card=card,
-                trello=trello,
-                state=state,
-                config=config,
-            )
-
-            mock_run.assert_called_once()
+        calls = run_maint(mock_result)
+        result = await handle_maintenance_command(
+            card=card,
+            trello=trello,
+            state=state,
+            config=handler_config,
+        )
 
+        assert len(calls) == 1
         assert result is True
-        trello.add_comment.assert_called_once()
-        comment_arg = trello.add_comment.call_args[0][1]
-        assert "/maintenance command completed" in comment_arg
-        assert "testproject" in comment_arg
-        trello.move_to_ready.assert_called_once()
+        _assert_comment(trello, "/maintenance command completed", "testproject")
+        assert len(trello.moved_to_ready) == 1
 
         # Verify state was updated
         assert state.get_ticket_count("testproject") == 0  # Reset
         assert state.get_last_maintenance("testproject") is not None
         assert state.get_session("testproject") == "new-session-123"
 
-    @pytest.mark.asyncio
-    async def test_handle_maintenance_failure(self, tmp_path):
+    async def test_handle_maintenance_failure(self, handler_config, trello, state, run_maint):
         """Test failed /maintenance command."""
-        from trellm.state import StateManager
-
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
-        config = self._create_test_config("testproject")
-
-        card = TrelloCard(
-            id="maint-card-123",
-            name="testproject /maintenance",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
-
-        trello = MagicMock()
-        trello.add_comment = AsyncMock()
-        trello.move_to_ready = AsyncMock()
+        card = _MAINT_CARD
 
         mock_result = MaintenanceResult(
             success=False,
             summary="Maintenance timed out",
         )
 
-        with patch("trellm.__main__.run_maintenance", return_value=mock_result):
-            result = await handle_maintenance_command(
-                card=card,
-                trello=trello,
-                state=state,
-                config=config,
-            )
+        run_maint(mock_result)
+        result = await handle_maintenance_command(
+            card=card,
+            trello=trello,
+            state=state,
+            config=handler_config,
+        )
 
         assert result is True  # Card was handled
-        comment_arg = trello.add_comment.call_args[0][1]
-        assert "/maintenance command failed" in comment_arg
-        assert "testproject" in comment_arg
-        trello.move_to_ready.assert_called_once()
+        _assert_comment(trello, "/maintenance command failed", "testproject")
+        assert len(trello.moved_to_ready) == 1
 
         # Verify state was NOT updated (no reset on failure)
         assert state.get_last_maintenance("testproject") is None
 
-    @pytest.mark.asyncio
-    async def test_handle_maintenance_with_alias(self, tmp_path):
+    async def test_handle_maintenance_with_alias(self, alias_config, trello, state, run_maint):
         """Test /maintenance command using a project alias."""
-        from trellm.state import StateManager
-
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
-
-        # Config with alias
-        config = Config(
-            trello=TrelloConfig(
-                api_key="key",
-                api_token="token",
-                board_id="board",
-                todo_list_id="todo",
-                ready_to_try_list_id="ready",
-                icebox_list_id="icebox",
-            ),
-            claude=ClaudeConfig(
-                binary="claude",
-                timeout=60,
-                projects={
-                    "smugcoin": ProjectConfig(
-                        working_dir="/tmp/smugcoin",
-                        aliases=["smg"],
-                        maintenance=MaintenanceConfig(enabled=True, interval=10),
-                    )
-                },
-            ),
-        )
-
         # Card uses alias "smg" instead of canonical "smugcoin"
-        card = TrelloCard(
-            id="maint-alias-123",
-            name="smg /maintenance",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
-
-        trello = MagicMock()
-        trello.add_comment = AsyncMock()
-        trello.move_to_ready = AsyncMock()
+        card = replace(_MAINT_CARD, id="maint-alias-123", name="smg /maintenance")
 
         mock_result = MaintenanceResult(
             success=True,
@@ -489,271 +356,92 @@ class TestHandleMaintenanceCommand:
             session_id="alias-session-123",
         )
 
-        with patch("trellm.__main__.run_maintenance", return_value=mock_result) as mock_run:
-            result = await handle_maintenance_command(
-                card=card,
-                trello=trello,
-                state=state,
-                config=config,
-            )
+        calls = run_maint(mock_result)
+        result = await handle_maintenance_command(
+            card=card,
+            trello=trello,
+            state=state,
+            config=alias_config,
+        )
 
-            mock_run.assert_called_once()
-            # Verify it was called with the canonical project name
-            call_kwargs = mock_run.call_args[1]
-            assert call_kwargs["project"] == "smugcoin"
+        assert len(calls) == 1
+        # Verify it was called with the canonical project name
+        assert calls[0]["project"] == "smugcoin"
 
         assert result is True
-        comment_arg = trello.add_comment.call_args[0][1]
-        assert "/maintenance command completed" in comment_arg
-        assert "smugcoin" in comment_arg
-
-
-class TestIsResetSessionCommand:
-    """Tests for is_reset_session_command function."""
-
-    def test_reset_session_command_basic(self):
-        """Test basic /reset-session command detection."""
-        assert is_reset_session_command("project /reset-session")
-        assert is_reset_session_command("trellm /reset-session")
-        assert is_reset_session_command("jcapp /reset-session")
-
-    def test_reset_session_command_with_colon(self):
-        """Test /reset-session with project colon format."""
-        assert is_reset_session_command("project: /reset-session")
-
-    def test_reset_session_command_case_insensitive(self):
-        """Test /reset-session is case insensitive."""
-        assert is_reset_session_command("project /RESET-SESSION")
-        assert is_reset_session_command("project /Reset-Session")
-
-    def test_not_reset_session_command(self):
-        """Test regular cards are not detected as /reset-session."""
-        assert not is_reset_session_command("project Add reset feature")
-        assert not is_reset_session_command("trellm Fix bug")
-        assert not is_reset_session_command("project / reset-session")  # space breaks
-
-    def test_reset_session_not_after_project_name(self):
-        """Test /reset-session must appear immediately after project name."""
-        assert not is_reset_session_command("trellm problem with /reset-session")
-        assert not is_reset_session_command("project fix /reset-session issue")
-
-    def test_reset_session_with_valid_projects_filter(self):
-        """Test /reset-session with valid_projects filter."""
-        valid = {"trellm", "jcapp"}
-        assert is_reset_session_command("trellm /reset-session", valid)
-        assert is_reset_session_command("jcapp /reset-session", valid)
-        assert not is_reset_session_command("other /reset-session", valid)
-
-    def test_reset_session_single_word_not_matched(self):
-        """Test that single word cards are not matched."""
-        assert not is_reset_session_command("/reset-session")
-        assert not is_reset_session_command("project")
-
-    def test_reset_session_with_alias_in_valid_projects(self):
-        """Test /reset-session with aliases in valid_projects set."""
-        valid = {"smugcoin", "smg", "jcapp"}
-        assert is_reset_session_command("smg /reset-session", valid)
-        assert is_reset_session_command("smugcoin /reset-session", valid)
+        _assert_comment(trello, "/maintenance command completed", "smugcoin")
 
 
 class TestHandleResetSessionCommand:
     """Tests for handle_reset_session_command function."""
 
-    def _create_test_config(self, project: str = "testproject", session_id: str = None) -> Config:
-        """Create a test configuration."""
-        return Config(
-            trello=TrelloConfig(
-                api_key="key",
-                api_token="token",
-                board_id="board",
-                todo_list_id="todo",
-                ready_to_try_list_id="ready",
-            ),
-            claude=ClaudeConfig(
-                binary="claude",
-                timeout=60,
-                projects={
-                    project: ProjectConfig(
-                        working_dir="/tmp/testproject",
-                        session_id=session_id,
-                    )
-                },
-            ),
-        )
-
-    @pytest.mark.asyncio
-    async def test_handle_reset_session_clears_state(self, tmp_path):
+    async def test_handle_reset_session_clears_state(self, handler_config, trello, state):
         """Test /reset-session clears session from state."""
-        from trellm.state import StateManager
-
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
         state.set_session("testproject", "old-session-123")
-        config = self._create_test_config("testproject")
-
-        card = TrelloCard(
-            id="reset-card-123",
-            name="testproject /reset-session",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
 
-        trello = MagicMock()
-        trello.add_comment = AsyncMock()
-        trello.move_to_ready = AsyncMock()
+        card = _RESET_CARD
 
         result = await handle_reset_session_command(
-            card=card, trello=trello, state=state, config=config,
+            card=card, trello=trello, state=state, config=handler_config,
         )
 
         assert result is True
         assert state.get_session("testproject") is None
-        trello.add_comment.assert_called_once()
-        comment_arg = trello.add_comment.call_args[0][1]
-        assert "/reset-session completed" in comment_arg
-        assert "Cleared session ID from state" in comment_arg
-        trello.move_to_ready.assert_called_once()
+        _assert_comment(trello, "/reset-session completed", "Cleared session ID from state")
+        assert len(trello.moved_to_ready) == 1
 
-    @pytest.mark.asyncio
-    async def test_handle_reset_session_no_existing_session(self, tmp_path):
+    async def test_handle_reset_session_no_existing_session(self, handler_config, trello, state):
         """Test /reset-session when no session exists in state."""
-        from trellm.state import StateManager
-
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
-        config = self._create_test_config("testproject")
-
-        card = TrelloCard(
-            id="reset-card-123",
-            name="testproject /reset-session",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
-
-        trello = MagicMock()
-        trello.add_comment = AsyncMock()
-        trello.move_to_ready = AsyncMock()
+        card = _RESET_CARD
 
         result = await handle_reset_session_command(
-            card=card, trello=trello, state=state, config=config,
+            card=card, trello=trello, state=state, config=handler_config,
         )
 
         assert result is True
-        comment_arg = trello.add_comment.call_args[0][1]
-        assert "No session ID was set in state" in comment_arg
+        _assert_comment(trello, "No session ID was set in state")
 
-    @pytest.mark.asyncio
-    async def test_handle_reset_session_warns_about_config_session(self, tmp_path):
+    async def test_handle_reset_session_warns_about_config_session(self, handler_config, trello, state):
         """Test /reset-session warns if session_id also in config."""
-        from trellm.state import StateManager
-
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
         state.set_session("testproject", "state-session-123")
-        config = self._create_test_config("testproject", session_id="config-session-456")
-
-        card = TrelloCard(
-            id="reset-card-123",
-            name="testproject /reset-session",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
+        config = _with_project(
+            handler_config, "testproject",
+            working_dir="/tmp/testproject", session_id="config-session-456",
         )
 
-        trello = MagicMock()
-        trello.add_comment = AsyncMock()
-        trello.move_to_ready = AsyncMock()
+        card = _RESET_CARD
 
         result = await handle_reset_session_command(
             card=card, trello=trello, state=state, config=config,
         )
 
         assert result is True
-        comment_arg = trello.add_comment.call_args[0][1]
-        assert "config-session-456" in comment_arg
-        assert "Remove it from the config" in comment_arg
+        _assert_comment(trello, "config-session-456", "Remove it from the config")
 
-    @pytest.mark.asyncio
-    async def test_handle_reset_session_unknown_project(self, tmp_path):
+    async def test_handle_reset_session_unknown_project(self, handler_config, trello, state):
         """Test /reset-session for unknown project."""
-        from trellm.state import StateManager
-
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
-        config = self._create_test_config("otherproject")
-
-        card = TrelloCard(
-            id="reset-card-123",
-            name="unknownproject /reset-session",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
-
-        trello = MagicMock()
-        trello.add_comment = AsyncMock()
-        trello.move_to_ready = AsyncMock()
+        card = replace(_RESET_CARD, name="unknownproject /reset-session")
 
         result = await handle_reset_session_command(
-            card=card, trello=trello, state=state, config=config,
+            card=card, trello=trello, state=state, config=handler_config,
         )
 
         assert result is True
-        comment_arg = trello.add_comment.call_args[0][1]
-        assert "not found in configuration" in comment_arg
+        _assert_comment(trello, "not found in configuration")
 
-    @pytest.mark.asyncio
-    async def test_handle_reset_session_with_alias(self, tmp_path):
+    async def test_handle_reset_session_with_alias(self, alias_config, trello, state):
         """Test /reset-session command using a project alias."""
-        from trellm.state import StateManager
-
-        state_file = tmp_path / "state.json"
-        state = StateManager(str(state_file))
         state.set_session("smugcoin", "old-session-xyz")
 
-        config = Config(
-            trello=TrelloConfig(
-                api_key="key",
-                api_token="token",
-                board_id="board",
-                todo_list_id="todo",
-                ready_to_try_list_id="ready",
-            ),
-            claude=ClaudeConfig(
-                binary="claude",
-                timeout=60,
-                projects={
-                    "smugcoin": ProjectConfig(
-                        working_dir="/tmp/smugcoin",
-                        aliases=["smg"],
-                    )
-                },
-            ),
-        )
-
-        card = TrelloCard(
-            id="reset-alias-123",
-            name="smg /reset-session",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
-
-        trello = MagicMock()
-        trello.add_comment = AsyncMock()
-        trello.move_to_ready = AsyncMock()
+        card = replace(_RESET_CARD, id="reset-alias-123", name="smg /reset-session")
 
         result = await handle_reset_session_command(
-            card=card, trello=trello, state=state, config=config,
+            card=card, trello=trello, state=state, config=alias_config,
         )
 
         assert result is True
         assert state.get_session("smugcoin") is None
-        comment_arg = trello.add_comment.call_args[0][1]
-        assert "/reset-session completed" in comment_arg
-        assert "smugcoin" in comment_arg
+        _assert_comment(trello, "/reset-session completed", "smugcoin")
 
 
 class TestIsAbortCommand:
@@ -798,16 +486,9 @@ class TestIsAbortCommand:
 class TestHandleAbortCommand:
     """Tests for handle_abort_command function."""
 
-    @pytest.mark.asyncio
     async def test_handle_abort_no_tasks_no_cards(self):
         """Test /abort when there's nothing to abort."""
-        card = TrelloCard(
-            id="abort-card-123",
-            name="trellm /abort",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+        card = _ABORT_CARD
 
         trello = MagicMock()
         trello.get_todo_cards = AsyncMock(return_value=[])
@@ -828,16 +509,9 @@ class TestHandleAbortCommand:
         assert "/abort" in comment_arg
         trello.move_to_ready.assert_called_once_with("abort-card-123")
 
-    @pytest.mark.asyncio
     async def test_handle_abort_moves_todo_cards(self):
         """Test /abort moves TODO cards to READY TO TRY with comments."""
-        abort_card = TrelloCard(
-            id="abort-card-123",
-            name="trellm /abort",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+        abort_card = _ABORT_CARD
 
         todo_card1 = TrelloCard(
             id="todo-card-1",
@@ -881,16 +555,9 @@ class TestHandleAbortCommand:
         for call in todo_comments:
             assert "aborted" in call[0][1].lower()
 
-    @pytest.mark.asyncio
     async def test_handle_abort_cancels_running_tasks(self):
         """Test /abort cancels running asyncio tasks."""
-        abort_card = TrelloCard(
-            id="abort-card-123",
-            name="trellm /abort",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+        abort_card = _ABORT_CARD
 
         trello = MagicMock()
         trello.get_todo_cards = AsyncMock(return_value=[])
@@ -919,16 +586,9 @@ class TestHandleAbortCommand:
         task1.cancel.assert_called_once()
         task2.cancel.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_handle_abort_clears_processing_cards(self):
         """Test /abort clears the processing cards set."""
-        abort_card = TrelloCard(
-            id="abort-card-123",
-            name="trellm /abort",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+        abort_card = _ABORT_CARD
 
         trello = MagicMock()
         trello.get_todo_cards = AsyncMock(return_value=[])
@@ -948,16 +608,9 @@ class TestHandleAbortCommand:
         assert result is True
         assert len(processing_cards) == 0
 
-    @pytest.mark.asyncio
     async def test_handle_abort_summary_counts(self):
         """Test /abort confirmation comment includes correct counts."""
-        abort_card = TrelloCard(
-            id="abort-card-123",
-            name="trellm /abort",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+        abort_card = _ABORT_CARD
 
         todo_card = TrelloCard(
             id="todo-card-1",
@@ -1039,16 +692,9 @@ class TestIsRestartCommand:
 class TestHandleRestartCommand:
     """Tests for handle_restart_command function."""
 
-    @pytest.mark.asyncio
     async def test_handle_restart_raises_restart_requested(self):
         """Test /restart raises RestartRequested after handling."""
-        card = TrelloCard(
-            id="restart-card-123",
-            name="trellm /restart",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+        card = _RESTART_CARD
 
         trello = MagicMock()
         trello.get_todo_cards = AsyncMock(return_value=[])
@@ -1064,16 +710,9 @@ class TestHandleRestartCommand:
                 processing_cards=set(),
             )
 
-    @pytest.mark.asyncio
     async def test_handle_restart_posts_comment_before_restart(self):
         """Test /restart posts confirmation comment."""
-        card = TrelloCard(
-            id="restart-card-123",
-            name="trellm /restart",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+        card = _RESTART_CARD
 
         trello = MagicMock()
         trello.get_todo_cards = AsyncMock(return_value=[])
@@ -1094,16 +733,9 @@ class TestHandleRestartCommand:
         assert "/restart" in comment_arg
         trello.move_to_ready.assert_called_once_with("restart-card-123")
 
-    @pytest.mark.asyncio
     async def test_handle_restart_cancels_running_tasks(self):
         """Test /restart cancels running asyncio tasks."""
-        card = TrelloCard(
-            id="restart-card-123",
-            name="trellm /restart",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+        card = _RESTART_CARD
 
         trello = MagicMock()
         trello.get_todo_cards = AsyncMock(return_value=[])
@@ -1132,16 +764,9 @@ class TestHandleRestartCommand:
         task1.cancel.assert_called_once()
         task2.cancel.assert_called_once()
 
-    @pytest.mark.asyncio
     async def test_handle_restart_clears_processing_cards(self):
         """Test /restart clears the processing cards set."""
-        card = TrelloCard(
-            id="restart-card-123",
-            name="trellm /restart",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+        card = _RESTART_CARD
 
         trello = MagicMock()
         trello.get_todo_cards = AsyncMock(return_value=[])
@@ -1162,16 +787,9 @@ class TestHandleRestartCommand:
 
         assert len(processing_cards) == 0
 
-    @pytest.mark.asyncio
     async def test_handle_restart_summary_includes_counts(self):
         """Test /restart confirmation includes task/card counts."""
-        card = TrelloCard(
-            id="restart-card-123",
-            name="trellm /restart",
-            url="https://trello.com/c/test",
-            description="",
-            last_activity="2026-01-24T10:00:00Z",
-        )
+        card = _RESTART_CARD
 
         trello = MagicMock()
         trello.get_todo_cards = AsyncMock(return_value=[])
@@ -1279,18 +897,15 @@ class TestProcessCardForProjectMonthlyLimit:
             ),
         )
 
-    @pytest.mark.asyncio
-    async def test_monthly_limit_triggers_global_pause(self, tmp_path):
+    async def test_monthly_limit_triggers_global_pause(self, state):
         """When ClaudeRunner raises MonthlyLimitError, the polling loop
         must enter a global pause so it stops retrying the same card."""
-        from trellm.state import StateManager
         from trellm.claude import MonthlyLimitError
         from trellm.__main__ import (
             process_card_for_project,
             is_globally_rate_limited,
         )
 
-        state = StateManager(str(tmp_path / "state.json"))
         config = self._make_config()
 
         card = TrelloCard(
@@ -1322,15 +937,12 @@ class TestProcessCardForProjectMonthlyLimit:
         assert result is None
         assert is_globally_rate_limited() is True
 
-    @pytest.mark.asyncio
-    async def test_monthly_limit_does_not_mark_card_processed(self, tmp_path):
+    async def test_monthly_limit_does_not_mark_card_processed(self, state):
         """The card must NOT be marked processed — once the pause clears,
         we want to try again (the limit may have reset)."""
-        from trellm.state import StateManager
         from trellm.claude import MonthlyLimitError
         from trellm.__main__ import process_card_for_project
 
-        state = StateManager(str(tmp_path / "state.json"))
         config = self._make_config()
 
         card = TrelloCard(
@@ -1500,14 +1112,11 @@ class TestProcessCardFailureRecording:
             last_activity="2026-05-13T10:00:00Z",
         )
 
-    @pytest.mark.asyncio
-    async def test_generic_runtime_error_records_error(self, tmp_path):
+    async def test_generic_runtime_error_records_error(self, state):
         """A RuntimeError from claude.run() must register as an error in
         _card_retry_state so the polling loop can apply backoff."""
-        from trellm.state import StateManager
         from trellm.__main__ import process_card_for_project, _card_retry_state
 
-        state = StateManager(str(tmp_path / "state.json"))
         config = self._make_config()
         card = self._make_card()
 
@@ -1529,14 +1138,11 @@ class TestProcessCardFailureRecording:
         assert _card_retry_state[card.id].error_count == 1
         assert _card_retry_state[card.id].timeout_count == 0
 
-    @pytest.mark.asyncio
-    async def test_timeout_runtime_error_records_timeout(self, tmp_path):
+    async def test_timeout_runtime_error_records_timeout(self, state):
         """A RuntimeError whose message contains 'timed out after' must
         increment timeout_count, not error_count."""
-        from trellm.state import StateManager
         from trellm.__main__ import process_card_for_project, _card_retry_state
 
-        state = StateManager(str(tmp_path / "state.json"))
         config = self._make_config()
         card = self._make_card()
 
@@ -1559,20 +1165,17 @@ class TestProcessCardFailureRecording:
         assert _card_retry_state[card.id].timeout_count == 1
         assert _card_retry_state[card.id].error_count == 0
 
-    @pytest.mark.asyncio
-    async def test_success_clears_retry_state(self, tmp_path):
+    async def test_success_clears_retry_state(self, state):
         """A successful run must clear the card's retry entry — the next
         failure starts a fresh streak at 30s, not whatever the previous
         streak was."""
         from trellm.claude import ClaudeResult
-        from trellm.state import StateManager
         from trellm.__main__ import (
             process_card_for_project,
             _card_retry_state,
             CardRetryState,
         )
 
-        state = StateManager(str(tmp_path / "state.json"))
         config = self._make_config()
         card = self._make_card()
 
@@ -1599,7 +1202,6 @@ class TestProcessCardFailureRecording:
 
         assert card.id not in _card_retry_state
 
-    @pytest.mark.asyncio
     async def test_should_skip_card_for_backoff_returns_true_during_backoff(self):
         """Helper used by the polling loop: True when the card is in
         backoff and shouldn't be re-spawned this tick."""
@@ -1617,7 +1219,6 @@ class TestProcessCardFailureRecording:
 
         assert should_skip_card_for_backoff("card-busy") is True
 
-    @pytest.mark.asyncio
     async def test_should_skip_card_for_backoff_returns_false_after_expiry(self):
         """Once the backoff window expires, the polling loop should
         re-spawn the card."""
@@ -1634,21 +1235,17 @@ class TestProcessCardFailureRecording:
 
         assert should_skip_card_for_backoff("card-expired") is False
 
-    @pytest.mark.asyncio
     async def test_should_skip_card_for_backoff_returns_false_for_unknown_card(self):
         """A card that has never failed has no entry — must not skip."""
         from trellm.__main__ import should_skip_card_for_backoff
         assert should_skip_card_for_backoff("never-seen") is False
 
-    @pytest.mark.asyncio
-    async def test_monthly_limit_does_not_record_retry_state(self, tmp_path):
+    async def test_monthly_limit_does_not_record_retry_state(self, state):
         """Org/monthly limit hits trigger the global pause — they shouldn't
         ALSO record a per-card failure (would double-penalize the card)."""
         from trellm.claude import MonthlyLimitError
-        from trellm.state import StateManager
         from trellm.__main__ import process_card_for_project, _card_retry_state
 
-        state = StateManager(str(tmp_path / "state.json"))
         config = self._make_config()
         card = self._make_card()
 
@@ -1858,16 +1455,13 @@ class TestProcessCardFailurePostsRetryComment:
             last_activity="2026-05-13T10:00:00Z",
         )
 
-    @pytest.mark.asyncio
-    async def test_timeout_posts_retry_context_comment(self, tmp_path):
+    async def test_timeout_posts_retry_context_comment(self, state):
         """When claude.py surfaces a timeout ('timed out after Ns'), the
         harness must post a Claude:-prefixed comment that names the
         timeout failure mode so the next run can adapt instead of just
         re-running the same plan."""
-        from trellm.state import StateManager
         from trellm.__main__ import process_card_for_project
 
-        state = StateManager(str(tmp_path / "state.json"))
         config = self._make_config()
         card = self._make_card()
 
@@ -1906,16 +1500,13 @@ class TestProcessCardFailurePostsRetryComment:
         # And it should be on the right card.
         assert retry_comments[0].args[0] == card.id
 
-    @pytest.mark.asyncio
-    async def test_generic_error_posts_retry_context_comment(self, tmp_path):
+    async def test_generic_error_posts_retry_context_comment(self, state):
         """Same expectation for a non-timeout error: the harness should
         surface what failed so the next run has context. The wording
         differs from the timeout case (no 'killed after X minutes') but
         it must still start with 'Claude:' and quote the error."""
-        from trellm.state import StateManager
         from trellm.__main__ import process_card_for_project
 
-        state = StateManager(str(tmp_path / "state.json"))
         config = self._make_config()
         card = self._make_card()
 
@@ -1944,17 +1535,14 @@ class TestProcessCardFailurePostsRetryComment:
             f"{trello.add_comment.call_args_list}"
         )
 
-    @pytest.mark.asyncio
-    async def test_monthly_limit_does_not_post_retry_context_comment(self, tmp_path):
+    async def test_monthly_limit_does_not_post_retry_context_comment(self, state):
         """Account-wide usage limits aren't card-specific — posting a
         'previous run failed' comment on every TODO card would be noise.
         The MonthlyLimitError branch must NOT post a retry-context
         comment."""
         from trellm.claude import MonthlyLimitError
-        from trellm.state import StateManager
         from trellm.__main__ import process_card_for_project
 
-        state = StateManager(str(tmp_path / "state.json"))
         config = self._make_config()
         card = self._make_card()
 
@@ -1977,17 +1565,14 @@ class TestProcessCardFailurePostsRetryComment:
             f"got: {trello.add_comment.call_args_list}"
         )
 
-    @pytest.mark.asyncio
-    async def test_add_comment_failure_does_not_break_retry_state(self, tmp_path):
+    async def test_add_comment_failure_does_not_break_retry_state(self, state):
         """If posting the retry-context comment itself fails (Trello
         API hiccup), the failure must still be recorded in
         _card_retry_state so the polling loop applies backoff. The
         retry-context comment is best-effort — it must never be allowed
         to crash the failure handler."""
-        from trellm.state import StateManager
         from trellm.__main__ import process_card_for_project, _card_retry_state
 
-        state = StateManager(str(tmp_path / "state.json"))
         config = self._make_config()
         card = self._make_card()
 
@@ -2009,3 +1594,28 @@ class TestProcessCardFailurePostsRetryComment:
 
         assert card.id in _card_retry_state
         assert _card_retry_state[card.id].error_count == 1
+
+
+class TestRunEventLoop:
+    """Tests for running the main coroutine on the optional uvloop loop."""
+
+    async def _answer(self):
+        return 42
+
+    def test_uses_asyncio_run_without_uvloop(self, monkeypatch):
+        """Test that a missing uvloop falls back to the stdlib event loop."""
+        monkeypatch.setitem(sys.modules, "uvloop", None)  # import raises ImportError
+        run = MagicMock(wraps=asyncio.run)
+        monkeypatch.setattr(asyncio, "run", run)
+
+        assert _run_event_loop(self._answer()) == 42
+        run.assert_called_once()
+
+    def test_uses_uvloop_run_when_installed(self, monkeypatch):
+        """Test that uvloop.run drives the coroutine when uvloop is importable."""
+        fake_uvloop = MagicMock()
+        fake_uvloop.run = MagicMock(wraps=asyncio.run)
+        monkeypatch.setitem(sys.modules, "uvloop", fake_uvloop)
+
+        assert _run_event_loop(self._answer()) == 42
+        fake_uvloop.run.assert_called_once()
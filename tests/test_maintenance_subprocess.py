@@ -0,0 +1,504 @@
+"""Async tests for the maintenance module: run_maintenance's subprocess
+path and the Trello card it leaves behind.
+
+The synchronous tests (prompt building, state, config) live in
+test_maintenance.py.
+"""
+
+import asyncio
+import json
+from functools import lru_cache
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from trellm.config import ClaudeConfig, TrelloConfig
+from trellm.maintenance import _update_maintenance_card, run_maintenance
+from trellm.trello import TrelloCard, TrelloClient
+
+from tests.helpers import maint_config
+
+
+# stdout of a successful maintenance run, and of a successful /compact
+_MAINT_SESSION_ID = "maint-session-123"
+_SUCCESS_JSON = json.dumps(
+    {"type": "result", "result": "Maintenance completed", "session_id": _MAINT_SESSION_ID}
+).encode() + b"\n"
+_COMPACTED_SESSION_ID = "compacted-session-id"
+_COMPACT_JSON = json.dumps({"session_id": _COMPACTED_SESSION_ID}).encode() + b"\n"
+
+
+def _communicate(out: bytes, err: bytes = b""):
+    """Plain coroutine function standing in for ``proc.communicate``."""
+
+    async def communicate():
+        return out, err
+
+    return communicate
+
+
+class _FakeExec:
+    """run_maintenance ``claude_exec`` stand-in; no subprocess involved.
+
+    Returns the given (returncode, stdout, stderr) results in order, reusing
+    the last one, and records each argv in ``calls``. A result that is an
+    exception is raised instead, e.g. ``asyncio.TimeoutError``.
+    """
+
+    def __init__(self, *results: tuple[int, bytes, bytes] | BaseException):
+        self.results = results or ((0, _SUCCESS_JSON, b""),)
+        self.calls: list[list[str]] = []
+
+    async def __call__(self, cmd: list[str], cwd: Path, timeout: float):
+        self.calls.append(cmd)
+        result = self.results[min(len(self.calls), len(self.results)) - 1]
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+
+@lru_cache(maxsize=None)
+def _claude_config(yolo: bool = False) -> ClaudeConfig:
+    """Shared ClaudeConfig per yolo setting; run_maintenance only reads it."""
+    return ClaudeConfig(binary="claude", timeout=60, yolo=yolo)
+
+
+async def _run(tmp_path: Path, **overrides):
+    """run_maintenance for ``testproject`` in ``tmp_path`` with the shared configs.
+
+    Defaults to no prior session, no prior maintenance and ten tickets;
+    ``overrides`` replace any of those or add further arguments.
+    """
+    kwargs = {
+        "project": "testproject",
+        "working_dir": str(tmp_path),
+        "session_id": None,
+        "claude_config": _claude_config(),
+        "maintenance_config": maint_config(True, 10),
+        "ticket_count": 10,
+        "last_maintenance": None,
+        **overrides,
+    }
+    return await run_maintenance(**kwargs)
+
+
+def _make_proc(returncode: int = 0, out: bytes = _SUCCESS_JSON, err: bytes = b""):
+    """Fresh mocked maintenance process with the given exit code and output."""
+    proc = MagicMock(spec=asyncio.subprocess.Process)
+    proc.returncode = returncode
+    proc.communicate = _communicate(out, err)
+    return proc
+
+
+@pytest.fixture
+def install_procs(monkeypatch):
+    """Make ``asyncio.create_subprocess_exec`` hand out the given procs in order.
+
+    The last proc is reused for any further calls. Returns the list the
+    positional args of each call are appended to.
+    """
+
+    def install(*procs) -> list[tuple]:
+        calls: list[tuple] = []
+
+        async def fake_exec(*args, **kwargs):
+            calls.append(args)
+            return procs[min(len(calls), len(procs)) - 1]
+
+        monkeypatch.setattr("asyncio.create_subprocess_exec", fake_exec)
+        return calls
+
+    return install
+
+
+class TestRunMaintenance:
+    """Tests for run_maintenance function."""
+
+    async def test_run_maintenance_success(self, tmp_path, install_procs):
+        """Test successful maintenance run through the real subprocess path.
+
+        The only test that goes through ``_exec_claude``; the others pass a
+        ``_FakeExec``.
+        """
+        install_procs(_make_proc())
+
+        result = await _run(tmp_path, session_id="existing-session")
+
+        assert result.success is True
+        assert result.session_id == _MAINT_SESSION_ID
+
+    async def test_run_maintenance_interactive_runner_is_not_supported(self, tmp_path):
+        """Maintenance runs `claude -p` directly (print transport). An
+        interactive project's maintenance turn would need to be typed into
+        its live TUI window — that wiring is deliberately deferred (M4 landed
+        InteractiveSession but keeps maintenance disabled, docs/claude-interactive.md
+        §9). Until then run_maintenance must report 'not supported' for a
+        non-print runner instead of silently spawning a metered subprocess."""
+        claude_exec = _FakeExec()
+
+        result = await _run(
+            tmp_path,
+            runner_mode="interactive",
+            claude_exec=claude_exec,
+        )
+
+        assert result.success is False
+        assert "interactive" in result.summary.lower()
+        # No subprocess was spawned.
+        assert claude_exec.calls == []
+
+    async def test_run_maintenance_failure(self, tmp_path):
+        """Test maintenance run that fails."""
+        claude_exec = _FakeExec((1, b"", b"Error: command failed"))
+
+        result = await _run(tmp_path, claude_exec=claude_exec)
+
+        assert result.success is False
+        assert "failed" in result.summary.lower()
+
+    async def test_run_maintenance_timeout(self, tmp_path):
+        """Test maintenance run that times out."""
+        # What _exec_claude's wait_for raises once the timeout expires
+        claude_exec = _FakeExec(asyncio.TimeoutError())
+
+        result = await _run(tmp_path, claude_exec=claude_exec)
+
+        assert result.success is False
+        assert "timed out" in result.summary.lower()
+
+    async def test_run_maintenance_with_yolo_flag(self, tmp_path):
+        """Test that yolo flag is passed to subprocess."""
+        claude_exec = _FakeExec()
+
+        await _run(
+            tmp_path,
+            claude_config=_claude_config(yolo=True),
+            claude_exec=claude_exec,
+        )
+
+        # Check that --dangerously-skip-permissions was passed
+        assert "--dangerously-skip-permissions" in claude_exec.calls[0]
+
+    async def test_run_maintenance_resumes_session(self, tmp_path):
+        """Test that maintenance compacts first then resumes with compacted session."""
+        # First call is compact, second is maintenance
+        claude_exec = _FakeExec((0, _COMPACT_JSON, b""), (0, _SUCCESS_JSON, b""))
+
+        await _run(tmp_path, session_id="existing-session-id", claude_exec=claude_exec)
+
+        # Should have been called twice: compact then maintenance
+        assert len(claude_exec.calls) == 2
+
+        # First call should be compact with original session
+        compact_call_args = claude_exec.calls[0]
+        assert "/compact" in compact_call_args
+        assert "--resume" in compact_call_args
+        assert "existing-session-id" in compact_call_args
+
+        # Second call should be maintenance with compacted session
+        maintenance_call_args = claude_exec.calls[1]
+        assert "--resume" in maintenance_call_args
+        assert _COMPACTED_SESSION_ID in maintenance_call_args
+
+    async def test_run_maintenance_continues_when_compact_fails(self, tmp_path):
+        """Test that maintenance continues with original session when compact fails."""
+        # Compact exits non-zero, maintenance succeeds
+        claude_exec = _FakeExec((1, b"", b"Compact failed\n"), (0, _SUCCESS_JSON, b""))
+
+        result = await _run(
+            tmp_path,
+            session_id="existing-session-id",
+            claude_exec=claude_exec,
+        )
+
+        # Maintenance should still succeed despite compact failure
+        assert result.success
+
+        # Should have been called twice
+        assert len(claude_exec.calls) == 2
+
+        # Second call should use original session ID (compact failed)
+        maintenance_call_args = claude_exec.calls[1]
+        assert "--resume" in maintenance_call_args
+        assert "existing-session-id" in maintenance_call_args
+
+    async def test_run_maintenance_no_compact_without_session(self, tmp_path):
+        """Test that maintenance skips compaction when there's no existing session."""
+        claude_exec = _FakeExec()
+
+        # _run passes no session by default = no compact
+        await _run(tmp_path, claude_exec=claude_exec)
+
+        # Should only be called once (maintenance, no compact)
+        assert len(claude_exec.calls) == 1
+
+        # Should not have --resume
+        assert "--resume" not in claude_exec.calls[0]
+
+
+class TestMaintenanceTrelloCard:
+    """Tests for Trello card creation/update in maintenance."""
+
+    async def test_update_maintenance_card_creates_new(self):
+        """Test that a new card is created when none exists."""
+        mock_client = AsyncMock(spec=TrelloClient)
+        mock_client.find_card_by_name = AsyncMock(return_value=None)
+        mock_client.create_card = AsyncMock(
+            return_value=TrelloCard(
+                id="new-card-id",
+                name="testproject regular maintenance",
+                description="summary",
+                url="https://trello.com/c/abc123",
+                last_activity="2026-01-24T00:00:00Z",
+            )
+        )
+
+        await _update_maintenance_card(
+            trello_client=mock_client,
+            icebox_list_id="icebox-list-123",
+            project="testproject",
+            summary="Test maintenance summary",
+            prefix="[test] ",
+        )
+
+        mock_client.find_card_by_name.assert_called_once_with(
+            list_id="icebox-list-123",
+            name="testproject regular maintenance",
+        )
+        mock_client.create_card.assert_called_once_with(
+            list_id="icebox-list-123",
+            name="testproject regular maintenance",
+            description="Test maintenance summary",
+        )
+
+    async def test_update_maintenance_card_updates_existing(self):
+        """Test that existing card is updated when found."""
+        existing_card = TrelloCard(
+            id="existing-card-id",
+            name="testproject regular maintenance",
+            description="old summary",
+            url="https://trello.com/c/xyz789",
+            last_activity="2026-01-20T00:00:00Z",
+        )
+        mock_client = AsyncMock(spec=TrelloClient)
+        mock_client.find_card_by_name = AsyncMock(return_value=existing_card)
+        mock_client.update_card_description = AsyncMock()
+
+        await _update_maintenance_card(
+            trello_client=mock_client,
+            icebox_list_id="icebox-list-123",
+            project="testproject",
+            summary="New maintenance summary",
+            prefix="[test] ",
+        )
+
+        mock_client.find_card_by_name.assert_called_once()
+        mock_client.update_card_description.assert_called_once_with(
+            card_id="existing-card-id",
+            description="New maintenance summary",
+        )
+        # Should not create new card
+        mock_client.create_card.assert_not_called()
+
+    async def test_update_maintenance_card_handles_error(self):
+        """Test that errors in card update are handled gracefully."""
+        mock_client = AsyncMock(spec=TrelloClient)
+        mock_client.find_card_by_name = AsyncMock(
+            side_effect=Exception("API error")
+        )
+
+        # Should not raise
+        await _update_maintenance_card(
+            trello_client=mock_client,
+            icebox_list_id="icebox-list-123",
+            project="testproject",
+            summary="Test summary",
+            prefix="[test] ",
+        )
+
+    async def test_run_maintenance_with_trello_client(self, tmp_path):
+        """Test that run_maintenance creates Trello card when configured."""
+
+        mock_trello = AsyncMock(spec=TrelloClient)
+        mock_trello.find_card_by_name = AsyncMock(return_value=None)
+        mock_trello.create_card = AsyncMock(
+            return_value=TrelloCard(
+                id="card-123",
+                name="testproject regular maintenance",
+                description="Maintenance findings",
+                url="https://trello.com/c/abc",
+                last_activity="2026-01-24T00:00:00Z",
+            )
+        )
+
+        result = await _run(
+            tmp_path,
+            trello_client=mock_trello,
+            icebox_list_id="icebox-list-456",
+            claude_exec=_FakeExec(),
+        )
+
+        assert result.success is True
+        # Should have called Trello to create card
+        mock_trello.find_card_by_name.assert_called_once()
+        mock_trello.create_card.assert_called_once()
+
+    async def test_run_maintenance_without_trello_client(self, tmp_path):
+        """Test that run_maintenance works without Trello client."""
+        # No trello_client or icebox_list_id
+        result = await _run(tmp_path, claude_exec=_FakeExec())
+
+        assert result.success is True
+
+
+class TestTrelloClientMethods:
+    """Tests for new TrelloClient methods."""
+
+    async def test_find_card_by_name_found(self):
+        """Test finding a card by name when it exists."""
+        config = TrelloConfig(
+            api_key="key",
+            api_token="token",
+            board_id="board",
+            todo_list_id="todo",
+        )
+        client = TrelloClient(config)
+
+        mock_response = [
+            {"id": "card1", "name": "Other Card", "desc": "", "url": "url1", "dateLastActivity": "2026-01-01"},
+            {"id": "card2", "name": "Target Card", "desc": "desc", "url": "url2", "dateLastActivity": "2026-01-02"},
+        ]
+
+        with patch.object(client, "_request", return_value=mock_response):
+            result = await client.find_card_by_name("list-123", "target card")
+
+        assert result is not None
+        assert result.id == "card2"
+        assert result.name == "Target Card"
+
+    async def test_find_card_by_name_not_found(self):
+        """Test finding a card by name when it doesn't exist."""
+        config = TrelloConfig(
+            api_key="key",
+            api_token="token",
+            board_id="board",
+            todo_list_id="todo",
+        )
+        client = TrelloClient(config)
+
+        mock_response = [
+            {"id": "card1", "name": "Other Card", "desc": "", "url": "url1", "dateLastActivity": "2026-01-01"},
+        ]
+
+        with patch.object(client, "_request", return_value=mock_response):
+            result = await client.find_card_by_name("list-123", "nonexistent")
+
+        assert result is None
+
+    async def test_create_card(self):
+        """Test creating a new card."""
+        config = TrelloConfig(
+            api_key="key",
+            api_token="token",
+            board_id="board",
+            todo_list_id="todo",
+        )
+        client = TrelloClient(config)
+
+        mock_response = {
+            "id": "new-card-id",
+            "name": "New Card",
+            "desc": "Description",
+            "url": "https://trello.com/c/abc",
+            "dateLastActivity": "2026-01-24",
+        }
+
+        with patch.object(client, "_request", return_value=mock_response) as mock_req:
+            result = await client.create_card("list-123", "New Card", "Description")
+
+            mock_req.assert_called_once_with(
+                "POST",
+                "/cards",
+                params={
+                    "idList": "list-123",
+                    "name": "New Card",
+                    "desc": "Description",
+                },
+            )
+
+        assert result.id == "new-card-id"
+        assert result.name == "New Card"
+        assert result.description == "Description"
+
+    async def test_update_card_description(self):
+        """Test updating a card's description."""
+        config = TrelloConfig(
+            api_key="key",
+            api_token="token",
+            board_id="board",
+            todo_list_id="todo",
+        )
+        client = TrelloClient(config)
+
+        with patch.object(client, "_request", return_value={}) as mock_req:
+            await client.update_card_description("card-123", "New description")
+
+            mock_req.assert_called_once_with(
+                "PUT",
+                "/cards/card-123",
+                json_data={"desc": "New description"},
+            )
+
+
+class TestMaintenanceMcpConfigFlag:
+    """M2 — verify run_maintenance + its inner _run_compact propagate the
+    `--mcp-config <patchright-json>` flag so maintenance runs share the same
+    patchright MCP attachment as task spawns when the project has it
+    enabled."""
+
+    _PATCHRIGHT_JSON = json.dumps(
+        {"mcpServers": {"patchright": {"command": "node", "args": ["/p/dist/index.js"]}}}
+    )
+
+    @staticmethod
+    def _cmd_has_mcp_config(cmd_args, expected_json):
+        cmd_list = list(cmd_args)
+        for i, token in enumerate(cmd_list):
+            if token == "--mcp-config":
+                return i + 1 < len(cmd_list) and cmd_list[i + 1] == expected_json
+        return False
+
+    async def test_maintenance_omits_mcp_config_by_default(self, tmp_path):
+        claude_exec = _FakeExec()
+        await _run(tmp_path, claude_exec=claude_exec)
+        assert "--mcp-config" not in claude_exec.calls[-1]
+
+    async def test_maintenance_appends_mcp_config_when_enabled(self, tmp_path):
+        claude_exec = _FakeExec()
+        await _run(
+            tmp_path,
+            browser_enabled=True,
+            mcp_config_json=self._PATCHRIGHT_JSON,
+            claude_exec=claude_exec,
+        )
+        assert self._cmd_has_mcp_config(claude_exec.calls[-1], self._PATCHRIGHT_JSON)
+
+    async def test_maintenance_compact_path_carries_mcp_config(self, tmp_path):
+        """When maintenance compacts an existing session before running,
+        the compact spawn must also carry --mcp-config — otherwise the
+        patchright MCP would not be loaded for the compact subprocess and
+        the post-compact session would lose the attachment."""
+        claude_exec = _FakeExec((0, _COMPACT_JSON, b""), (0, _SUCCESS_JSON, b""))
+        await _run(
+            tmp_path,
+            session_id="prior",  # forces a /compact pre-step
+            browser_enabled=True,
+            mcp_config_json=self._PATCHRIGHT_JSON,
+            claude_exec=claude_exec,
+        )
+        assert len(claude_exec.calls) == 2
+        for args in claude_exec.calls:
+            assert self._cmd_has_mcp_config(
+                args, self._PATCHRIGHT_JSON
+            ), f"--mcp-config missing from spawn: {args}"
@@ -114,7 +114,6 @@ class TestSessionManagerResolution:
         )
         assert manager.session_for("demo") is manager.session_for("demo")
 
-    @pytest.mark.asyncio
     async def test_shutdown_is_noop(self, tmp_path):
         """shutdown() is awaitable and a no-op while only print mode exists —
         PrintSession owns no resources to tear down."""
@@ -128,7 +127,6 @@ class TestSessionManagerResolution:
 class TestPrintSessionRunTask:
     """PrintSession.run_task delegates to ClaudeRunner.run unchanged."""
 
-    @pytest.mark.asyncio
     async def test_passes_byte_identical_kwargs(self, tmp_path):
         """run_task must hand ClaudeRunner.run exactly the arguments the
         old __main__.py call site did — this is the zero-behaviour-change
@@ -160,7 +158,6 @@ class TestPrintSessionRunTask:
             "timeout": 999,
         }
 
-    @pytest.mark.asyncio
     async def test_state_session_beats_config_session(self, tmp_path):
         """A session id in state.json wins over the config-file initial id."""
         config = _config(session_id="config-sess")
@@ -175,7 +172,6 @@ class TestPrintSessionRunTask:
 
         assert runner.run.await_args.kwargs["session_id"] == "state-sess"
 
-    @pytest.mark.asyncio
     async def test_falls_back_to_config_session(self, tmp_path):
         """With no session in state, run_task uses the config-file id."""
         config = _config(session_id="config-sess")
@@ -189,7 +185,6 @@ class TestPrintSessionRunTask:
 
         assert runner.run.await_args.kwargs["session_id"] == "config-sess"
 
-    @pytest.mark.asyncio
     async def test_persists_new_session_id(self, tmp_path):
         """After a successful run, the returned session id is persisted to
         state keyed by the card just processed — exactly as the old call
@@ -209,7 +204,6 @@ class TestPrintSessionRunTask:
         assert state.get_session("demo") == "fresh-sess"
         assert state.get_last_card_id("demo") == card.id
 
-    @pytest.mark.asyncio
     async def test_does_not_persist_when_no_session_id(self, tmp_path):
         """A result with no session id leaves state untouched."""
         config = _config()
@@ -225,7 +219,6 @@ class TestPrintSessionRunTask:
 
         assert state.get_session("demo") is None
 
-    @pytest.mark.asyncio
     async def test_returns_runner_result(self, tmp_path):
         """run_task returns the ClaudeResult produced by the runner."""
         expected = ClaudeResult(
@@ -238,7 +231,6 @@ class TestPrintSessionRunTask:
         result = await session.run_task(_card(), timeout=1)
         assert result is expected
 
-    @pytest.mark.asyncio
     async def test_propagates_runner_errors(self, tmp_path):
         """Errors from ClaudeRunner.run propagate unchanged so the polling
         loop's MonthlyLimitError / retry-backoff handling still fires."""
@@ -48,6 +48,7 @@ def _run_needs_browser(cfg_path: Path) -> int:
     return result.returncode
 
 
+@pytest.mark.slow
 class TestNeedsBrowserStackScript:
     """The decision-logic helper that start-trellm.sh calls to figure out
     whether to bring up the browser stack before launching trellm."""
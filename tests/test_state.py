@@ -11,18 +11,16 @@ from trellm.state import StateManager
 class TestStateManager:
     """Tests for StateManager class."""
 
-    def test_initial_state(self, tmp_path):
+    def test_initial_state(self):
         """Test initial state when file doesn't exist."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         assert manager.get_session("project") is None
         assert not manager.is_processed("card123")
 
-    def test_set_and_get_session(self, tmp_path):
+    def test_set_and_get_session(self):
         """Test setting and getting session IDs."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.set_session("project1", "session-abc")
         manager.set_session("project2", "session-xyz")
@@ -42,10 +40,78 @@ class TestStateManager:
         manager2 = StateManager(str(state_file))
         assert manager2.get_session("project") == "session-123"
 
-    def test_mark_processed(self, tmp_path):
-        """Test marking cards as processed."""
+    def test_in_memory_state_is_not_written(self, tmp_path, monkeypatch):
+        """Test that a StateManager without a file keeps state in memory."""
+        monkeypatch.chdir(tmp_path)
+        manager = StateManager()
+
+        manager.set_session("project", "session-123")
+        manager.record_cost(card_id="card1", project="project", total_cost="$1.00")
+
+        assert manager.path is None
+        assert manager.get_session("project") == "session-123"
+        assert manager.get_stats().total_cost_cents == 100
+        assert list(tmp_path.iterdir()) == []
+
+    def test_only_none_selects_in_memory_state(self):
+        """Test that an empty state_file is not mistaken for in-memory mode."""
+        assert StateManager(None).path is None
+        assert StateManager("").path is not None
+
+    def test_bulk_load_saves_once(self, tmp_path, monkeypatch):
+        """Test that bulk_load seeds everything with a single write."""
+        manager = StateManager(str(tmp_path / "state.json"))
+        writes = []
+        monkeypatch.setattr(manager, "_rollup_old_dates", lambda: writes.append(1))
+
+        manager.bulk_load(
+            sessions={"project": "session-123"},
+            tickets={"project": ["card1", "card2"]},
+            costs=[{"card_id": "card1", "project": "project", "total_cost": "$1.00"}],
+        )
+
+        assert writes == [1]
+        manager2 = StateManager(str(tmp_path / "state.json"))
+        assert manager2.get_session("project") == "session-123"
+        assert manager2.get_ticket_count("project") == 2
+        assert manager2.get_stats().total_cost_cents == 100
+
+    def test_with_block_saves_once_on_exit(self, tmp_path, monkeypatch):
+        """Test that changes inside a with block are written once, at exit."""
         state_file = tmp_path / "state.json"
         manager = StateManager(str(state_file))
+        writes = []
+        monkeypatch.setattr(manager, "_rollup_old_dates", lambda: writes.append(1))
+
+        with manager:
+            manager.add_processed_ticket("project", "card1")
+            manager.add_processed_ticket("project", "card2")
+            manager.bulk_load(tickets={"project": ["card3"]})
+            assert writes == []
+            assert not state_file.exists()
+
+        assert writes == [1]
+        assert StateManager(str(state_file)).get_ticket_count("project") == 3
+
+    def test_with_block_skips_write_when_it_raises(self, tmp_path):
+        """Test that a with block that raises doesn't persist its partial changes."""
+        state_file = tmp_path / "state.json"
+        manager = StateManager(str(state_file))
+        manager.add_processed_ticket("project", "card1")
+
+        with pytest.raises(RuntimeError):
+            with manager:
+                manager.add_processed_ticket("project", "card2")
+                raise RuntimeError("boom")
+
+        assert StateManager(str(state_file)).get_ticket_count("project") == 1
+        # The next save outside a block goes through as usual
+        manager.add_processed_ticket("project", "card3")
+        assert StateManager(str(state_file)).get_ticket_count("project") == 3
+
+    def test_mark_processed(self):
+        """Test marking cards as processed."""
+        manager = StateManager()
 
         assert not manager.is_processed("card123")
 
@@ -63,10 +129,9 @@ class TestStateManager:
         manager2 = StateManager(str(state_file))
         assert manager2.is_processed("card123")
 
-    def test_clear_processed(self, tmp_path):
+    def test_clear_processed(self):
         """Test clearing processed status."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.mark_processed("card123")
         assert manager.is_processed("card123")
@@ -74,10 +139,9 @@ class TestStateManager:
         manager.clear_processed("card123")
         assert not manager.is_processed("card123")
 
-    def test_clear_session(self, tmp_path):
+    def test_clear_session(self):
         """Test clearing session ID for a project."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.set_session("project1", "session-abc")
         assert manager.get_session("project1") == "session-abc"
@@ -86,18 +150,16 @@ class TestStateManager:
         assert result is True
         assert manager.get_session("project1") is None
 
-    def test_clear_session_nonexistent(self, tmp_path):
+    def test_clear_session_nonexistent(self):
         """Test clearing session for a project with no session."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         result = manager.clear_session("nonexistent")
         assert result is False
 
-    def test_clear_session_preserves_other_data(self, tmp_path):
+    def test_clear_session_preserves_other_data(self):
         """Test that clearing session preserves other session data."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.set_session("project1", "session-abc", last_card_id="card123")
         manager.add_processed_ticket("project1", "card123")
@@ -120,10 +182,9 @@ class TestStateManager:
         manager2 = StateManager(str(state_file))
         assert manager2.get_session("project1") is None
 
-    def test_should_reprocess(self, tmp_path):
+    def test_should_reprocess(self):
         """Test reprocess detection."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Card not processed yet - should not reprocess
         assert not manager.should_reprocess("card123", "2026-01-08T12:00:00Z")
@@ -146,20 +207,18 @@ class TestStateManager:
         manager = StateManager(str(state_file))
         assert manager.get_session("project") is None
 
-    def test_set_session_with_last_card_id(self, tmp_path):
+    def test_set_session_with_last_card_id(self):
         """Test setting session with last_card_id."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.set_session("project1", "session-abc", last_card_id="card123")
 
         assert manager.get_session("project1") == "session-abc"
         assert manager.get_last_card_id("project1") == "card123"
 
-    def test_get_last_card_id_none(self, tmp_path):
+    def test_get_last_card_id_none(self):
         """Test get_last_card_id returns None when not set."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # No session set
         assert manager.get_last_card_id("project1") is None
@@ -179,10 +238,9 @@ class TestStateManager:
         manager2 = StateManager(str(state_file))
         assert manager2.get_last_card_id("project") == "card456"
 
-    def test_update_session_preserves_last_card_id(self, tmp_path):
+    def test_update_session_preserves_last_card_id(self):
         """Test updating session preserves existing last_card_id if not provided."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Set initial session with card ID
         manager.set_session("project", "session-1", last_card_id="card123")
@@ -193,10 +251,9 @@ class TestStateManager:
         assert manager.get_session("project") == "session-2"
         assert manager.get_last_card_id("project") == "card123"
 
-    def test_update_last_card_id(self, tmp_path):
+    def test_update_last_card_id(self):
         """Test updating last_card_id to a new value."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.set_session("project", "session-1", last_card_id="card123")
         manager.set_session("project", "session-2", last_card_id="card456")
@@ -207,10 +264,9 @@ class TestStateManager:
 class TestStateManagerStats:
     """Tests for StateManager stats functionality."""
 
-    def test_record_cost_basic(self, tmp_path):
+    def test_record_cost_basic(self):
         """Test recording cost for a single ticket."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card123",
@@ -229,10 +285,9 @@ class TestStateManagerStats:
         assert stats.total_lines_added == 100
         assert stats.total_lines_removed == 50
 
-    def test_record_cost_multiple_tickets(self, tmp_path):
+    def test_record_cost_multiple_tickets(self):
         """Test recording cost for multiple tickets."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card1",
@@ -257,10 +312,9 @@ class TestStateManagerStats:
         assert stats.total_lines_added == 150
         assert stats.total_lines_removed == 50
 
-    def test_get_stats_per_project(self, tmp_path):
+    def test_get_stats_per_project(self):
         """Test getting stats filtered by project."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card1",
@@ -298,10 +352,9 @@ class TestStateManagerStats:
         assert stats.total_cost_cents == 500
         assert stats.total_tickets == 1
 
-    def test_parse_cost_variations(self, tmp_path):
+    def test_parse_cost_variations(self):
         """Test parsing various cost formats."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Dollar format
         assert manager._parse_cost("$1.23") == 123
@@ -318,10 +371,9 @@ class TestStateManagerStats:
         assert manager._parse_cost(None) == 0
         assert manager._parse_cost("") == 0
 
-    def test_parse_duration_variations(self, tmp_path):
+    def test_parse_duration_variations(self):
         """Test parsing various duration formats."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Standard formats
         assert manager._parse_duration("2m 30s") == 150
@@ -337,10 +389,9 @@ class TestStateManagerStats:
         assert manager._parse_duration(None) == 0
         assert manager._parse_duration("") == 0
 
-    def test_parse_code_changes(self, tmp_path):
+    def test_parse_code_changes(self):
         """Test parsing code change formats."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         assert manager._parse_code_changes("+100 -50") == (100, 50)
         assert manager._parse_code_changes("+500") == (500, 0)
@@ -348,10 +399,9 @@ class TestStateManagerStats:
         assert manager._parse_code_changes(None) == (0, 0)
         assert manager._parse_code_changes("") == (0, 0)
 
-    def test_aggregated_stats_properties(self, tmp_path):
+    def test_aggregated_stats_properties(self):
         """Test AggregatedStats computed properties."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card1",
@@ -369,10 +419,9 @@ class TestStateManagerStats:
         assert stats.average_cost_cents == 1500.0
         assert stats.average_cost_dollars == "$15.00"
 
-    def test_format_duration(self, tmp_path):
+    def test_format_duration(self):
         """Test duration formatting."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card1",
@@ -385,10 +434,9 @@ class TestStateManagerStats:
         assert stats.api_duration_formatted == "1h 30m"
         assert stats.wall_duration_formatted == "2h 45m"
 
-    def test_format_stats_report(self, tmp_path):
+    def test_format_stats_report(self):
         """Test stats report formatting."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card1",
@@ -406,10 +454,9 @@ class TestStateManagerStats:
         assert "+200" in report
         assert "-100" in report
 
-    def test_empty_stats(self, tmp_path):
+    def test_empty_stats(self):
         """Test getting stats with no data."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         stats = manager.get_stats()
         assert stats.total_cost_cents == 0
@@ -417,10 +464,9 @@ class TestStateManagerStats:
         assert stats.total_cost_dollars == "$0.00"
         assert stats.average_cost_cents == 0
 
-    def test_ticket_history_limit(self, tmp_path):
+    def test_ticket_history_limit(self):
         """Test that ticket history is limited to 100 entries."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Add 105 tickets
         for i in range(105):
@@ -436,10 +482,9 @@ class TestStateManagerStats:
         assert manager.state["stats"]["ticket_history"][0]["card_id"] == "card5"
         assert manager.state["stats"]["ticket_history"][-1]["card_id"] == "card104"
 
-    def test_get_stats_nonexistent_project(self, tmp_path):
+    def test_get_stats_nonexistent_project(self):
         """Test getting stats for a project that doesn't exist."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         stats = manager.get_stats("nonexistent")
         assert stats.total_cost_cents == 0
@@ -449,12 +494,11 @@ class TestStateManagerStats:
 class TestStatsRollup:
     """Tests for RRDTool-style date rollup functionality."""
 
-    def test_daily_entries_within_30_days_preserved(self, tmp_path):
+    def test_daily_entries_within_30_days_preserved(self):
         """Test that daily entries within 30 days are not rolled up."""
         from datetime import datetime, timezone
 
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Add entries for the last 30 days
         today = datetime.now(timezone.utc).date()
@@ -476,12 +520,11 @@ class TestStatsRollup:
         daily_keys = [k for k in by_date.keys() if not k.startswith("week-") and not k.startswith("month-")]
         assert len(daily_keys) == 30
 
-    def test_entries_31_to_90_days_rolled_to_weekly(self, tmp_path):
+    def test_entries_31_to_90_days_rolled_to_weekly(self):
         """Test that entries 31-90 days old are rolled into weekly buckets."""
         from datetime import datetime, timezone, timedelta
 
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Add entries for days 31-60 (should be rolled to weekly)
         today = datetime.now(timezone.utc).date()
@@ -507,12 +550,11 @@ class TestStatsRollup:
         weekly_keys = [k for k in by_date.keys() if k.startswith("week-")]
         assert len(weekly_keys) > 0
 
-    def test_entries_over_90_days_rolled_to_monthly(self, tmp_path):
+    def test_entries_over_90_days_rolled_to_monthly(self):
         """Test that entries over 90 days old are rolled into monthly buckets."""
         from datetime import datetime, timezone, timedelta
 
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Add entries for days 91-120 (should be rolled to monthly)
         today = datetime.now(timezone.utc).date()
@@ -538,12 +580,11 @@ class TestStatsRollup:
         monthly_keys = [k for k in by_date.keys() if k.startswith("month-")]
         assert len(monthly_keys) > 0
 
-    def test_rollup_preserves_totals(self, tmp_path):
+    def test_rollup_preserves_totals(self):
         """Test that rollup preserves the total values."""
         from datetime import datetime, timezone, timedelta
 
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Add 100 daily entries over 100 days
         today = datetime.now(timezone.utc).date()
@@ -574,12 +615,11 @@ class TestStatsRollup:
         assert actual_cost == expected_cost
         assert actual_tickets == expected_tickets
 
-    def test_rollup_weekly_to_monthly(self, tmp_path):
+    def test_rollup_weekly_to_monthly(self):
         """Test that old weekly buckets are rolled into monthly buckets."""
         from datetime import datetime, timezone, timedelta
 
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Directly add an old weekly bucket (from 100 days ago)
         today = datetime.now(timezone.utc).date()
@@ -610,10 +650,9 @@ class TestStatsRollup:
         total_cost = sum(v.get("total_cost_cents", 0) for v in by_date.values())
         assert total_cost == 500
 
-    def test_empty_bucket_helper(self, tmp_path):
+    def test_empty_bucket_helper(self):
         """Test _empty_bucket returns correct structure."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         bucket = manager._empty_bucket()
         assert bucket["total_cost_cents"] == 0
@@ -623,10 +662,9 @@ class TestStatsRollup:
         assert bucket["total_lines_added"] == 0
         assert bucket["total_lines_removed"] == 0
 
-    def test_aggregate_into_bucket(self, tmp_path):
+    def test_aggregate_into_bucket(self):
         """Test _aggregate_into_bucket correctly aggregates."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         bucket = manager._empty_bucket()
         stats = {
@@ -648,12 +686,11 @@ class TestStatsRollup:
         assert bucket["total_lines_added"] == 100
         assert bucket["total_lines_removed"] == 50
 
-    def test_rollup_no_effect_on_recent_data(self, tmp_path):
+    def test_rollup_no_effect_on_recent_data(self):
         """Test that rollup doesn't affect data within 30 days."""
         from datetime import datetime, timezone, timedelta
 
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Add a single recent entry
         today = datetime.now(timezone.utc).date()
@@ -678,10 +715,9 @@ class TestStatsRollup:
 class TestTokenTracking:
     """Tests for token usage tracking functionality."""
 
-    def test_record_cost_with_tokens(self, tmp_path):
+    def test_record_cost_with_tokens(self):
         """Test recording cost including token usage."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card123",
@@ -702,10 +738,9 @@ class TestTokenTracking:
         assert stats.total_cache_creation_tokens == 200
         assert stats.total_cache_read_tokens == 5000
 
-    def test_token_aggregation_multiple_tickets(self, tmp_path):
+    def test_token_aggregation_multiple_tickets(self):
         """Test that tokens are properly aggregated across tickets."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card1",
@@ -732,10 +767,9 @@ class TestTokenTracking:
         assert stats.total_cache_creation_tokens == 250
         assert stats.total_cache_read_tokens == 7000
 
-    def test_token_stats_per_project(self, tmp_path):
+    def test_token_stats_per_project(self):
         """Test getting token stats filtered by project."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card1",
@@ -760,10 +794,9 @@ class TestTokenTracking:
         assert stats2.total_input_tokens == 2000
         assert stats2.total_output_tokens == 400
 
-    def test_format_tokens_helper(self, tmp_path):
+    def test_format_tokens_helper(self):
         """Test the format_tokens helper method."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
         stats = manager.get_stats()
 
         # Test small numbers
@@ -782,10 +815,9 @@ class TestTokenTracking:
         assert stats.format_tokens(2_500_000) == "2.50M"
         assert stats.format_tokens(10_000_000) == "10.00M"
 
-    def test_total_tokens_property(self, tmp_path):
+    def test_total_tokens_property(self):
         """Test the total_tokens property (input + output)."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card1",
@@ -799,10 +831,9 @@ class TestTokenTracking:
         assert stats.total_tokens == 1500
         assert stats.total_tokens_formatted == "1.5K"
 
-    def test_token_formatting_properties(self, tmp_path):
+    def test_token_formatting_properties(self):
         """Test the various token formatting properties."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card1",
@@ -818,10 +849,9 @@ class TestTokenTracking:
         assert stats.output_tokens_formatted == "5.0K"
         assert stats.cache_read_tokens_formatted == "1.00M"
 
-    def test_format_stats_report_includes_tokens(self, tmp_path):
+    def test_format_stats_report_includes_tokens(self):
         """Test that format_stats_report includes token statistics."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card123",
@@ -847,10 +877,9 @@ class TestTokenTracking:
         assert "5.0K" in report   # output tokens
         assert "100.0K" in report  # cache read
 
-    def test_ticket_history_includes_tokens(self, tmp_path):
+    def test_ticket_history_includes_tokens(self):
         """Test that ticket history records include token data."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         manager.record_cost(
             card_id="card123",
@@ -869,10 +898,9 @@ class TestTokenTracking:
         assert history[0]["cache_creation_tokens"] == 200
         assert history[0]["cache_read_tokens"] == 5000
 
-    def test_empty_bucket_includes_token_fields(self, tmp_path):
+    def test_empty_bucket_includes_token_fields(self):
         """Test that _empty_bucket includes token fields."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         bucket = manager._empty_bucket()
         assert "total_input_tokens" in bucket
@@ -881,10 +909,9 @@ class TestTokenTracking:
         assert "total_cache_read_tokens" in bucket
         assert bucket["total_input_tokens"] == 0
 
-    def test_aggregate_into_bucket_includes_tokens(self, tmp_path):
+    def test_aggregate_into_bucket_includes_tokens(self):
         """Test that _aggregate_into_bucket handles token fields."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         bucket = manager._empty_bucket()
         stats = {
@@ -904,10 +931,9 @@ class TestTokenTracking:
         assert bucket["total_cache_creation_tokens"] == 200
         assert bucket["total_cache_read_tokens"] == 10000
 
-    def test_backward_compatibility_no_tokens(self, tmp_path):
+    def test_backward_compatibility_no_tokens(self):
         """Test backward compatibility with old stats without token data."""
-        state_file = tmp_path / "state.json"
-        manager = StateManager(str(state_file))
+        manager = StateManager()
 
         # Simulate old state without token fields
         manager.state["stats"]["global"] = {
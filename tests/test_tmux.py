@@ -42,7 +42,6 @@ class TestTmuxArgvConstruction:
     """Each method must build the exact tmux command line documented in
     docs/claude-interactive.md §6.1 / §8."""
 
-    @pytest.mark.asyncio
     async def test_has_session_true_on_zero_exit(self):
         controller = TmuxController()
         with patch(
@@ -53,7 +52,6 @@ class TestTmuxArgvConstruction:
             "tmux", "has-session", "-t", "trellm-interactive",
         ]
 
-    @pytest.mark.asyncio
     async def test_has_session_false_on_nonzero_exit(self):
         """has-session exits non-zero when the session is absent — that is
         the answer, not an error, so it must not raise."""
@@ -64,7 +62,6 @@ class TestTmuxArgvConstruction:
         ):
             assert await controller.has_session() is False
 
-    @pytest.mark.asyncio
     async def test_create_session_creates_when_absent(self):
         """Absent session → new-session runs, returns True."""
         controller = TmuxController()
@@ -79,7 +76,6 @@ class TestTmuxArgvConstruction:
             "tmux", "new-session", "-d", "-s", "trellm-interactive",
         ]
 
-    @pytest.mark.asyncio
     async def test_create_session_noop_when_present(self):
         """Existing session → new-session is NOT run, returns False."""
         controller = TmuxController()
@@ -92,7 +88,6 @@ class TestTmuxArgvConstruction:
         assert mock_exec.call_count == 1
         assert _argv(mock_exec, 0)[:2] == ["tmux", "has-session"]
 
-    @pytest.mark.asyncio
     async def test_create_window_without_command(self, tmp_path):
         controller = TmuxController()
         with patch(
@@ -104,7 +99,6 @@ class TestTmuxArgvConstruction:
             "-n", "demo", "-c", str(tmp_path),
         ]
 
-    @pytest.mark.asyncio
     async def test_create_window_with_command_appends_it_last(self, tmp_path):
         """A command, when given, is the final positional arg — M4 passes
         the `claude` invocation here."""
@@ -120,7 +114,6 @@ class TestTmuxArgvConstruction:
             "-n", "demo", "-c", str(tmp_path), "claude --continue",
         ]
 
-    @pytest.mark.asyncio
     async def test_create_window_expands_user_in_working_dir(self):
         """`~` in working_dir is expanded, mirroring claude.py / maintenance.py."""
         controller = TmuxController()
@@ -132,7 +125,6 @@ class TestTmuxArgvConstruction:
         assert cwd == os.path.expanduser("~/src/demo")
         assert "~" not in cwd
 
-    @pytest.mark.asyncio
     async def test_list_windows_parses_names(self):
         controller = TmuxController()
         procs = [
@@ -149,7 +141,6 @@ class TestTmuxArgvConstruction:
             "-F", "#{window_name}",
         ]
 
-    @pytest.mark.asyncio
     async def test_list_windows_empty_when_session_absent(self):
         """A cold start has no session — list_windows returns [] rather than
         raising, which is what doc §6.1's restart path relies on."""
@@ -163,7 +154,6 @@ class TestTmuxArgvConstruction:
         # Only the has-session probe ran; list-windows was skipped.
         assert mock_exec.call_count == 1
 
-    @pytest.mark.asyncio
     async def test_send_keys_single_key(self):
         controller = TmuxController()
         with patch(
@@ -174,7 +164,6 @@ class TestTmuxArgvConstruction:
             "tmux", "send-keys", "-t", "trellm-interactive:demo", "Enter",
         ]
 
-    @pytest.mark.asyncio
     async def test_send_keys_multiple_keys(self):
         controller = TmuxController()
         with patch(
@@ -186,7 +175,6 @@ class TestTmuxArgvConstruction:
             "Escape", "Enter",
         ]
 
-    @pytest.mark.asyncio
     async def test_send_keys_requires_at_least_one_key(self):
         controller = TmuxController()
         with patch("asyncio.create_subprocess_exec") as mock_exec:
@@ -194,7 +182,6 @@ class TestTmuxArgvConstruction:
                 await controller.send_keys("demo")
         mock_exec.assert_not_called()
 
-    @pytest.mark.asyncio
     async def test_send_literal_uses_dash_l(self):
         """Literal text goes through `send-keys -l` so spaces and words like
         `Enter` are typed as characters, not interpreted as key names."""
@@ -208,7 +195,6 @@ class TestTmuxArgvConstruction:
             "-l", "Read the task and Enter it",
         ]
 
-    @pytest.mark.asyncio
     async def test_capture_pane_returns_stdout(self):
         controller = TmuxController()
         with patch(
@@ -221,7 +207,6 @@ class TestTmuxArgvConstruction:
             "tmux", "capture-pane", "-p", "-t", "trellm-interactive:demo",
         ]
 
-    @pytest.mark.asyncio
     async def test_kill_window(self):
         controller = TmuxController()
         with patch(
@@ -241,7 +226,6 @@ class TestTmuxConfiguration:
         assert DEFAULT_SESSION == "trellm-interactive"
         assert TmuxController().session == "trellm-interactive"
 
-    @pytest.mark.asyncio
     async def test_custom_session_and_binary_used_in_argv(self):
         controller = TmuxController(session="humphrey-interactive", binary="/opt/tmux")
         assert controller.session == "humphrey-interactive"
@@ -258,7 +242,6 @@ class TestTmuxErrorHandling:
     """A non-zero tmux exit on a checked command must surface as TmuxError
     carrying the argv, exit code, and stderr."""
 
-    @pytest.mark.asyncio
     async def test_nonzero_exit_raises_tmux_error(self):
         controller = TmuxController()
         with patch(
@@ -279,6 +262,7 @@ class TestTmuxErrorHandling:
         assert issubclass(TmuxError, RuntimeError)
 
 
+@pytest.mark.slow
 @pytest.mark.skipif(
     shutil.which("tmux") is None, reason="tmux binary not installed"
 )
@@ -289,7 +273,6 @@ class TestTmuxIntegration:
     on the host is never touched, and tears the session down afterwards.
     """
 
-    @pytest.mark.asyncio
     async def test_full_lifecycle_against_real_tmux(self, tmp_path):
         session = f"trellm-itest-{os.getpid()}"
         controller = TmuxController(session=session)
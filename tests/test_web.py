@@ -1030,7 +1030,6 @@ class TestWebServerCompletedTasks:
         assert queue.qsize() == 1
         assert queue.get_nowait() is None
 
-    @pytest.mark.asyncio
     async def test_completed_api_exposes_status(self, web_server):
         """The /api/completed endpoint must surface the status field so
         the dashboard can render timeout/error badges."""
@@ -1043,7 +1042,6 @@ class TestWebServerCompletedTasks:
             data = await resp.json()
             assert data["completed"][0]["status"] == "timeout"
 
-    @pytest.mark.asyncio
     async def test_completed_tasks_api_endpoint(self, web_server):
         web_server.track_task("card1", "proj", "test card", "http://example.com")
         web_server.append_output("card1", "output line\n")
@@ -1057,7 +1055,6 @@ class TestWebServerCompletedTasks:
             assert data["completed"][0]["card_name"] == "test card"
             assert data["completed"][0]["output_lines"] == 1
 
-    @pytest.mark.asyncio
     async def test_completed_includes_tokens_from_history(self, web_server):
         """Recent Completions should surface tokens for each finished card
         so users don't need a separate history view to see usage."""
@@ -1081,7 +1078,6 @@ class TestWebServerCompletedTasks:
             assert data["completed"][0]["input_tokens"] == 12345
             assert data["completed"][0]["output_tokens"] == 678
 
-    @pytest.mark.asyncio
     async def test_completed_tokens_zero_without_history(self, web_server):
         """Falls back to zero tokens when no record_cost was made — keeps
         the API contract uniform regardless of whether stats landed."""
@@ -1095,7 +1091,6 @@ class TestWebServerCompletedTasks:
             assert data["completed"][0]["input_tokens"] == 0
             assert data["completed"][0]["output_tokens"] == 0
 
-    @pytest.mark.asyncio
     async def test_completed_uses_most_recent_history_for_card(self, web_server):
         """If a card was retried, the most recent ticket_history entry for
         that card_id is what users care about (earlier failed runs may have
@@ -1134,7 +1129,6 @@ class TestWebServerCompletedTasks:
 class TestWebServerSSEStream:
     """Tests for SSE streaming endpoint."""
 
-    @pytest.mark.asyncio
     async def test_stream_endpoint_exists(self, web_server):
         app = web_server._create_app()
         async with TestClient(TestServer(app)) as client:
@@ -1144,7 +1138,6 @@ class TestWebServerSSEStream:
             assert resp.status == 200
             assert resp.headers["Content-Type"] == "text/event-stream"
 
-    @pytest.mark.asyncio
     async def test_stream_sends_existing_buffer(self, web_server):
         app = web_server._create_app()
         async with TestClient(TestServer(app)) as client:
@@ -1158,7 +1151,6 @@ class TestWebServerSSEStream:
             assert "line 1" in text
             assert "line 2" in text
 
-    @pytest.mark.asyncio
     async def test_stream_uses_proper_sse_format(self, web_server):
         """SSE events must end with double newline for EventSource to parse."""
         app = web_server._create_app()
@@ -1171,7 +1163,6 @@ class TestWebServerSSEStream:
             # Each SSE event must have "data: ...\n\n" format
             assert "data: hello world\n\n" in text
 
-    @pytest.mark.asyncio
     async def test_stream_completed_via_run_id_while_same_card_running(self, web_server):
         """When a card has both a completed run and a new running run,
         streaming the completed run's output via run_id should return
@@ -1203,7 +1194,6 @@ class TestWebServerSSEStream:
             # Should contain done event (completed task)
             assert "event: done" in text
 
-    @pytest.mark.asyncio
     async def test_stream_completed_via_card_id_while_same_card_running(self, web_server):
         """When viewing completed output via card_id (e.g. from cached JS),
         and the same card is also running, the stream should serve the
@@ -1227,7 +1217,6 @@ class TestWebServerSSEStream:
             # Should contain running output
             assert "running output" in text
 
-    @pytest.mark.asyncio
     async def test_stream_unknown_card_returns_404(self, web_server):
         app = web_server._create_app()
         async with TestClient(TestServer(app)) as client:
@@ -1238,7 +1227,6 @@ class TestWebServerSSEStream:
 class TestWebServerConfigViewer:
     """Tests for config viewer endpoint."""
 
-    @pytest.mark.asyncio
     async def test_config_endpoint_exists(self, client):
         resp = await client.get("/api/config")
         assert resp.status == 200
@@ -1247,7 +1235,6 @@ class TestWebServerConfigViewer:
         assert "claude" in data
         assert "web" in data
 
-    @pytest.mark.asyncio
     async def test_config_masks_secrets(self, client):
         resp = await client.get("/api/config")
         data = await resp.json()
@@ -1257,21 +1244,18 @@ class TestWebServerConfigViewer:
         assert "***" in data["trello"]["api_key"]
         assert "***" in data["trello"]["api_token"]
 
-    @pytest.mark.asyncio
     async def test_config_shows_projects(self, client):
         resp = await client.get("/api/config")
         data = await resp.json()
         assert "testproject" in data["claude"]["projects"]
         assert data["claude"]["projects"]["testproject"]["working_dir"] == "~/src/testproject"
 
-    @pytest.mark.asyncio
     async def test_config_shows_web_settings(self, client):
         resp = await client.get("/api/config")
         data = await resp.json()
         assert data["web"]["enabled"] is True
         assert "port" in data["web"]
 
-    @pytest.mark.asyncio
     async def test_config_shows_poll_interval(self, client):
         resp = await client.get("/api/config")
         data = await resp.json()
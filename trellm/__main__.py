@@ -8,7 +8,7 @@ import sys
 import time
 from collections import defaultdict
 from dataclasses import asdict, dataclass, field
-from typing import Optional
+from typing import Any, Coroutine, Optional
 
 from .claude import ClaudeRunner, MonthlyLimitError, fetch_claude_usage_limits
 from .config import Config, load_config
@@ -217,13 +217,37 @@ def parse_project(card_name: str) -> str:
 
     Supports both "project task" and "project: task" formats.
     """
-    parts = card_name.split()
+    # Only the first word is needed, so don't split the whole title
+    parts = card_name.split(None, 1)
     if not parts:
         return "unknown"
     # Strip trailing colon if present (e.g., "trellm:" -> "trellm")
     return parts[0].rstrip(":").lower()
 
 
+def _split_command(card_name: str) -> tuple[str, str] | None:
+    """Return the lowercased (project, command) words of a card name.
+
+    The project has any trailing colon stripped. Returns None for cards
+    with fewer than two words.
+    """
+    # Only the first two words matter, so don't split the whole title
+    parts = card_name.lower().split(None, 2)
+    if len(parts) < 2:
+        return None
+    return parts[0].rstrip(":"), parts[1]
+
+
+def _is_project_command(
+    card_name: str, command: str, valid_projects: set[str] | None
+) -> bool:
+    """Check if `command` immediately follows a (valid) project name."""
+    parts = _split_command(card_name)
+    if parts is None or parts[1] != command:
+        return False
+    return valid_projects is None or parts[0] in valid_projects
+
+
 def is_stats_command(card_name: str, valid_projects: set[str] | None = None) -> bool:
     """Check if a card is a /stats command.
 
@@ -240,19 +264,7 @@ def is_stats_command(card_name: str, valid_projects: set[str] | None = None) ->
     Returns:
         True if the card is a valid /stats command, False otherwise.
     """
-    parts = card_name.lower().split()
-    if len(parts) < 2:
-        return False
-
-    # Extract project name (first word, strip colon)
-    project = parts[0].rstrip(":")
-
-    # Check if project is valid (if filter provided)
-    if valid_projects is not None and project not in valid_projects:
-        return False
-
-    # /stats must be the second word (immediately after project name)
-    return parts[1] == "/stats"
+    return _is_project_command(card_name, "/stats", valid_projects)
 
 
 def is_reset_session_command(card_name: str, valid_projects: set[str] | None = None) -> bool:
@@ -270,19 +282,7 @@ def is_reset_session_command(card_name: str, valid_projects: set[str] | None = N
     Returns:
         True if the card is a valid /reset-session command, False otherwise.
     """
-    parts = card_name.lower().split()
-    if len(parts) < 2:
-        return False
-
-    # Extract project name (first word, strip colon)
-    project = parts[0].rstrip(":")
-
-    # Check if project is valid (if filter provided)
-    if valid_projects is not None and project not in valid_projects:
-        return False
-
-    # /reset-session must be the second word (immediately after project name)
-    return parts[1] == "/reset-session"
+    return _is_project_command(card_name, "/reset-session", valid_projects)
 
 
 class RestartRequested(Exception):
@@ -302,15 +302,7 @@ def is_restart_command(card_name: str) -> bool:
     Returns:
         True if the card is a valid /restart command, False otherwise.
     """
-    parts = card_name.lower().split()
-    if len(parts) < 2:
-        return False
-
-    prefix = parts[0].rstrip(":")
-    if prefix != "trellm":
-        return False
-
-    return parts[1] == "/restart"
+    return _split_command(card_name) == ("trellm", "/restart")
 
 
 def is_abort_command(card_name: str) -> bool:
@@ -324,17 +316,8 @@ def is_abort_command(card_name: str) -> bool:
     Returns:
         True if the card is a valid /abort command, False otherwise.
     """
-    parts = card_name.lower().split()
-    if len(parts) < 2:
-        return False
-
     # Must use "trellm" as the prefix (literal, not a project name)
-    prefix = parts[0].rstrip(":")
-    if prefix != "trellm":
-        return False
-
-    # /abort must be the second word
-    return parts[1] == "/abort"
+    return _split_command(card_name) == ("trellm", "/abort")
 
 
 def is_maintenance_command(card_name: str, valid_projects: set[str] | None = None) -> bool:
@@ -353,19 +336,7 @@ def is_maintenance_command(card_name: str, valid_projects: set[str] | None = Non
     Returns:
         True if the card is a valid /maintenance command, False otherwise.
     """
-    parts = card_name.lower().split()
-    if len(parts) < 2:
-        return False
-
-    # Extract project name (first word, strip colon)
-    project = parts[0].rstrip(":")
-
-    # Check if project is valid (if filter provided)
-    if valid_projects is not None and project not in valid_projects:
-        return False
-
-    # /maintenance must be the second word (immediately after project name)
-    return parts[1] == "/maintenance"
+    return _is_project_command(card_name, "/maintenance", valid_projects)
 
 
 async def handle_stats_command(
@@ -580,10 +551,11 @@ async def handle_maintenance_command(
 
         if result.success:
             # Update state
-            state.set_last_maintenance(project)
-            state.reset_ticket_count(project)
-            if result.session_id:
-                state.set_session(project, result.session_id)
+            with state:
+                state.set_last_maintenance(project)
+                state.reset_ticket_count(project)
+                if result.session_id:
+                    state.set_session(project, result.session_id)
 
             # Post success comment
             comment = f"Claude: /maintenance command completed for {project}\n\n{result.summary}"
@@ -735,79 +707,77 @@ async def handle_restart_command(
     raise RestartRequested()
 
 
+# Settings whose changes are reported on a config reload. Anything else
+# (notably the Trello credentials) is deliberately left out, since the
+# change list is posted as a card comment.
+_RELOAD_CLAUDE_FIELDS = ("binary", "timeout", "yolo", "runner")
+_RELOAD_PROJECT_FIELDS = (
+    "working_dir", "session_id", "compact_prompt", "aliases", "timeout", "runner",
+)
+_RELOAD_TRELLO_FIELDS = ("ready_to_try_list_id", "done_board_id", "done_list_id")
+
+
+def _config_snapshot(config: Config) -> dict:
+    """Pick the reload-relevant settings out of a config, in report order.
+
+    Reads only the whitelisted attributes, so the snapshot never carries
+    the Trello credentials.
+    """
+    claude = config.claude
+    return {
+        "settings": {
+            "poll_interval": config.poll_interval,
+            **{f"claude.{key}": getattr(claude, key) for key in _RELOAD_CLAUDE_FIELDS},
+        },
+        "projects": {
+            name: {key: getattr(project, key) for key in _RELOAD_PROJECT_FIELDS}
+            for name, project in claude.projects.items()
+        },
+        "trello": {
+            key: getattr(config.trello, key) for key in _RELOAD_TRELLO_FIELDS
+        },
+    }
+
+
+def _diff_fields(old: dict, new: dict, prefix: str = "") -> list[str]:
+    """Describe each key whose value differs between two flat dicts.
+
+    Aliases are compared as a set, so reordering them is not a change,
+    but are reported as written.
+    """
+    return [
+        f"{prefix}{key}: {old[key]} → {new[key]}"
+        for key in old
+        if (
+            sorted(old[key]) != sorted(new[key]) if key == "aliases"
+            else old[key] != new[key]
+        )
+    ]
+
+
 def compare_configs(old: Config, new: Config) -> list[str]:
     """Compare two configs and return a list of changes.
 
     Returns a list of human-readable change descriptions.
     """
-    changes: list[str] = []
-
-    # Compare poll interval
-    if old.poll_interval != new.poll_interval:
-        changes.append(f"poll_interval: {old.poll_interval} → {new.poll_interval}")
-
-    # Compare Claude config
-    if old.claude.binary != new.claude.binary:
-        changes.append(f"claude.binary: {old.claude.binary} → {new.claude.binary}")
-    if old.claude.timeout != new.claude.timeout:
-        changes.append(f"claude.timeout: {old.claude.timeout} → {new.claude.timeout}")
-    if old.claude.yolo != new.claude.yolo:
-        changes.append(f"claude.yolo: {old.claude.yolo} → {new.claude.yolo}")
-    if old.claude.runner != new.claude.runner:
-        changes.append(f"claude.runner: {old.claude.runner} → {new.claude.runner}")
-
-    # Compare projects
-    old_projects = set(old.claude.projects.keys())
-    new_projects = set(new.claude.projects.keys())
-
-    for proj in new_projects - old_projects:
-        changes.append(f"Added project: {proj}")
-
-    for proj in old_projects - new_projects:
-        changes.append(f"Removed project: {proj}")
-
-    for proj in old_projects & new_projects:
-        old_proj = old.claude.projects[proj]
-        new_proj = new.claude.projects[proj]
-        if old_proj.working_dir != new_proj.working_dir:
-            changes.append(
-                f"{proj}.working_dir: {old_proj.working_dir} → {new_proj.working_dir}"
-            )
-        if old_proj.session_id != new_proj.session_id:
-            changes.append(
-                f"{proj}.session_id: {old_proj.session_id} → {new_proj.session_id}"
-            )
-        if old_proj.compact_prompt != new_proj.compact_prompt:
-            changes.append(
-                f"{proj}.compact_prompt: {old_proj.compact_prompt} → {new_proj.compact_prompt}"
-            )
-        if sorted(old_proj.aliases) != sorted(new_proj.aliases):
-            changes.append(
-                f"{proj}.aliases: {old_proj.aliases} → {new_proj.aliases}"
-            )
-        if old_proj.timeout != new_proj.timeout:
-            changes.append(
-                f"{proj}.timeout: {old_proj.timeout} → {new_proj.timeout}"
-            )
-        if old_proj.runner != new_proj.runner:
-            changes.append(
-                f"{proj}.runner: {old_proj.runner} → {new_proj.runner}"
-            )
+    old_snapshot = _config_snapshot(old)
+    new_snapshot = _config_snapshot(new)
 
-    # Compare Trello config (only relevant fields)
-    if old.trello.ready_to_try_list_id != new.trello.ready_to_try_list_id:
-        changes.append(
-            f"ready_to_try_list_id: {old.trello.ready_to_try_list_id} → "
-            f"{new.trello.ready_to_try_list_id}"
-        )
-    if old.trello.done_board_id != new.trello.done_board_id:
-        changes.append(
-            f"done_board_id: {old.trello.done_board_id} → {new.trello.done_board_id}"
-        )
-    if old.trello.done_list_id != new.trello.done_list_id:
-        changes.append(
-            f"done_list_id: {old.trello.done_list_id} → {new.trello.done_list_id}"
-        )
+    changes = _diff_fields(old_snapshot["settings"], new_snapshot["settings"])
+
+    old_projects = old_snapshot["projects"]
+    new_projects = new_snapshot["projects"]
+    changes.extend(
+        f"Added project: {proj}" for proj in new_projects if proj not in old_projects
+    )
+    changes.extend(
+        f"Removed project: {proj}" for proj in old_projects if proj not in new_projects
+    )
+    for proj, old_proj in old_projects.items():
+        if proj in new_projects:
+            changes.extend(_diff_fields(old_proj, new_projects[proj], f"{proj}."))
+
+    changes.extend(_diff_fields(old_snapshot["trello"], new_snapshot["trello"]))
 
     return changes
 
@@ -961,11 +931,12 @@ async def process_cards(
                     runner_mode=session_manager.get_runner_mode(project),
                 )
                 if maint_result.success:
-                    state.set_last_maintenance(project)
-                    state.reset_ticket_count(project)
-                    if maint_result.session_id:
-                        session_id = maint_result.session_id
-                        state.set_session(project, session_id, last_card_id=last_card_id)
+                    with state:
+                        state.set_last_maintenance(project)
+                        state.reset_ticket_count(project)
+                        if maint_result.session_id:
+                            session_id = maint_result.session_id
+                            state.set_session(project, session_id, last_card_id=last_card_id)
                     logger.info(
                         "[%s] Maintenance completed: %s",
                         project,
@@ -1086,11 +1057,12 @@ async def process_card_for_project(
                     runner_mode=session_manager.get_runner_mode(project),
                 )
                 if maint_result.success:
-                    state.set_last_maintenance(project)
-                    state.reset_ticket_count(project)
-                    if maint_result.session_id:
-                        session_id = maint_result.session_id
-                        state.set_session(project, session_id, last_card_id=last_card_id)
+                    with state:
+                        state.set_last_maintenance(project)
+                        state.reset_ticket_count(project)
+                        if maint_result.session_id:
+                            session_id = maint_result.session_id
+                            state.set_session(project, session_id, last_card_id=last_card_id)
                     logger.info(
                         "[%s] Maintenance completed: %s",
                         project,
@@ -1574,6 +1546,20 @@ async def run_once(config: Config, verbose: bool = False) -> int:
         await trello.close()
 
 
+def _run_event_loop(main: Coroutine[Any, Any, Any]) -> Any:
+    """``asyncio.run`` on uvloop when the optional "fast" extra is installed.
+
+    Most of trellm's event-loop time goes to Claude subprocess pipes, which
+    uvloop handles with less overhead. Without uvloop the stdlib loop is used.
+    """
+    try:
+        import uvloop
+    except ImportError:
+        return asyncio.run(main)
+    logger.debug("Using uvloop event loop")
+    return uvloop.run(main)
+
+
 def main() -> None:
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -1632,7 +1618,7 @@ def main() -> None:
     show_claude_output = args.verbose >= 1
     if args.once:
         try:
-            count = asyncio.run(run_once(config, verbose=show_claude_output))
+            count = _run_event_loop(run_once(config, verbose=show_claude_output))
             logger.info("Processed %d cards", count)
         except RestartRequested:
             logger.info("Restart requested, re-executing process...")
@@ -1640,7 +1626,7 @@ def main() -> None:
     else:
         while True:
             try:
-                asyncio.run(
+                _run_event_loop(
                     run_polling_loop(
                         config, verbose=show_claude_output, config_path=args.config
                     )
@@ -5,8 +5,9 @@ import functools
 import json
 import logging
 import os
-import re
 import subprocess
+import sys
+import threading
 import urllib.request
 import urllib.error
 from dataclasses import dataclass, field
@@ -15,8 +16,33 @@ from pathlib import Path
 from typing import Optional
 
 from .config import ClaudeConfig
+from .error_patterns import (
+    PROMPT_TOO_LONG_DETAILED_PATTERN,
+    PROMPT_TOO_LONG_SIMPLE_PATTERN,
+    RATE_LIMIT_PATTERN,
+    RATE_LIMIT_USER_PATTERN,
+    MONTHLY_LIMIT_PATTERN,
+    EXTRA_USAGE_PATTERN,
+    RATE_LIMIT_RESET_DURATION_PATTERN,
+    RATE_LIMIT_RESET_TIME_PATTERN,
+    SESSION_NOT_FOUND_PATTERN,
+)
 from .trello import TrelloCard
 
+# orjson is an optional speedup (the "fast" extra). Both parsers accept bytes
+# and raise ValueError subclasses on malformed input.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# msgspec (also in "fast") decodes session lines against a schema that keeps
+# only message.usage, skipping the often large message content entirely.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
 logger = logging.getLogger(__name__)
 
 # Claude Code projects directory
@@ -28,39 +54,6 @@ DEFAULT_CREDENTIALS_PATH = "~/.claude/.credentials.json"
 # Anthropic OAuth usage API endpoint
 USAGE_API_URL = "https://api.anthropic.com/api/oauth/usage"
 
-# Error patterns for Claude Code
-# Detailed pattern with token counts (e.g., "prompt is too long: 206453 tokens > 200000 maximum")
-PROMPT_TOO_LONG_DETAILED_PATTERN = re.compile(r"prompt is too long: (\d+) tokens? > (\d+) maximum")
-# Simple pattern for when Claude just says "Prompt is too long"
-PROMPT_TOO_LONG_SIMPLE_PATTERN = re.compile(r"prompt is too long", re.IGNORECASE)
-# API error pattern for rate limits
-RATE_LIMIT_PATTERN = re.compile(r"rate_limit_error")
-# User-facing rate limit pattern (e.g., "You've hit your limit")
-RATE_LIMIT_USER_PATTERN = re.compile(r"you've hit your limit", re.IGNORECASE)
-# Org/monthly usage limit (e.g., "You've hit your org's monthly usage limit").
-# Distinct from session rate limits because it has no parseable reset time and
-# typically lasts hours-to-weeks — busy-looping retries on this error wastes
-# polling cycles and pollutes the dashboard. The polling loop pauses globally
-# when this is hit; see MonthlyLimitError below.
-MONTHLY_LIMIT_PATTERN = re.compile(
-    r"hit your\s+org'?s?\s+monthly\s+usage\s+limit", re.IGNORECASE
-)
-# Claude Code OAuth "extra usage" depletion (e.g.,
-# "You're out of extra usage · resets 5:40am (UTC)"). Distinct wording from
-# the org-monthly limit but semantically the same outage class — same Claude
-# account = same wallet, so a global pause is correct. We treat it as a
-# MonthlyLimitError so the polling-loop pause path is reused (see Gotcha #8
-# in CLAUDE.md). Without this, the polling loop spawns the same card every
-# poll cycle until the limit resets (388 spawns observed for two smugcoin
-# cards in card ZCwyx8wO before the fix).
-EXTRA_USAGE_PATTERN = re.compile(r"out\s+of\s+(?:extra\s+)?usage", re.IGNORECASE)
-# Reset time as duration (e.g., "resets in 2 hours", "resets in 30 minutes")
-RATE_LIMIT_RESET_DURATION_PATTERN = re.compile(r"resets?\s+(?:in\s+)?(\d+)\s*(hours?|minutes?|h|m|days?|d)", re.IGNORECASE)
-# Reset time as clock time (e.g., "resets 8pm (UTC)", "resets 10am")
-RATE_LIMIT_RESET_TIME_PATTERN = re.compile(r"resets?\s+(\d{1,2})(?::(\d{2}))?\s*(am|pm)\s*(?:\(?(UTC|GMT)?\)?)?", re.IGNORECASE)
-# Session not found (e.g., "No conversation found with session ID: ...")
-SESSION_NOT_FOUND_PATTERN = re.compile(r"No conversation found with session ID", re.IGNORECASE)
-
 
 @dataclass
 class UsageLimitInfo:
@@ -76,8 +69,25 @@ class UsageLimitInfo:
         now = datetime.now(timezone.utc)
         if self.resets_at <= now:
             return "now"
-        # Format as "Jan 24, 2026 5:59 PM UTC"
-        return self.resets_at.strftime("%b %d, %Y %-I:%M %p UTC")
+        return _format_reset_timestamp(self.resets_at)
+
+
+# "Jan 24, 2026 5:59 PM UTC"; Windows spells the no-padding flag "#"
+# instead of "-"
+_RESET_TIME_FORMAT = (
+    "%b %d, %Y %#I:%M %p UTC" if sys.platform == "win32" else "%b %d, %Y %-I:%M %p UTC"
+)
+
+
+@functools.lru_cache(maxsize=64)
+def _format_reset_timestamp(resets_at: datetime) -> str:
+    """Format a reset time for display.
+
+    Cached because the web UI re-renders the same few reset times on every
+    refresh. Keyed on the reset time alone; the "now" check in
+    format_reset_time stays outside the cache so it flips on time.
+    """
+    return resets_at.strftime(_RESET_TIME_FORMAT)
 
 
 @dataclass
@@ -125,6 +135,17 @@ class ClaudeUsageLimits:
         return "\n".join(lines)
 
 
+@functools.lru_cache(maxsize=256)
+def _parse_iso(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp.
+
+    Cached because the usage API returns the same reset timestamps on every
+    poll until a window rolls over. datetimes are immutable, so sharing the
+    parsed value is safe.
+    """
+    return datetime.fromisoformat(value)
+
+
 def _parse_usage_limit(data: Optional[dict]) -> Optional[UsageLimitInfo]:
     """Parse usage limit data from API response."""
     if not data:
@@ -136,9 +157,7 @@ def _parse_usage_limit(data: Optional[dict]) -> Optional[UsageLimitInfo]:
     if data.get("resets_at"):
         try:
             # Parse ISO format datetime
-            resets_str = data["resets_at"]
-            # Handle timezone offset format
-            resets_at = datetime.fromisoformat(resets_str.replace("+00:00", "+00:00"))
+            resets_at = _parse_iso(data["resets_at"])
         except (ValueError, TypeError):
             pass
     return UsageLimitInfo(utilization=float(utilization), resets_at=resets_at)
@@ -232,6 +251,18 @@ def fetch_claude_usage_limits(
     )
 
 
+@functools.lru_cache(maxsize=256)
+def _mangle_working_dir(working_dir: str) -> str:
+    """Convert a working directory to Claude's project directory name.
+
+    e.g., /home/user/src/myproject -> -home-user-src-myproject
+
+    Cached because resolve() hits the filesystem and the same few project
+    directories are looked up after every card.
+    """
+    return str(Path(working_dir).expanduser().resolve()).replace("/", "-")
+
+
 def _get_session_jsonl_path(session_id: str, working_dir: Optional[str]) -> Optional[Path]:
     """Get the path to the JSONL file for a session.
 
@@ -248,18 +279,82 @@ def _get_session_jsonl_path(session_id: str, working_dir: Optional[str]) -> Opti
     if not working_dir:
         return None
 
-    # Convert working directory to Claude's project directory format
-    # e.g., /home/user/src/myproject -> -home-user-src-myproject
-    abs_path = Path(working_dir).expanduser().resolve()
-    project_dir_name = str(abs_path).replace("/", "-")
-
-    jsonl_path = CLAUDE_PROJECTS_DIR / project_dir_name / f"{session_id}.jsonl"
+    jsonl_path = CLAUDE_PROJECTS_DIR / _mangle_working_dir(working_dir) / f"{session_id}.jsonl"
+    # Not cached: session files appear and disappear between calls
     if jsonl_path.exists():
         return jsonl_path
 
     return None
 
 
+# Usage fields summed from session JSONL, in the order totals are kept
+_USAGE_KEYS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+_EMPTY: dict = {}
+
+if msgspec is not None:
+
+    class _SessionMessage(msgspec.Struct):
+        usage: Optional[dict] = None
+
+    class _SessionLine(msgspec.Struct):
+        message: Optional[_SessionMessage] = None
+
+    _decode_session_line = msgspec.json.Decoder(_SessionLine).decode
+else:
+    _decode_session_line = None
+
+# Session logs are append-only, so aggregated usage is cached per path along
+# with the offset just past the last complete line. Later reads resume from
+# that offset and only parse what Claude appended since.
+_TOKEN_USAGE_CACHE_SIZE = 256
+_token_usage_cache: dict[Path, tuple[int, int, tuple[int, ...]]] = {}
+# _read_token_usage_from_jsonl runs on worker threads (see _run_cost)
+_token_usage_cache_lock = threading.Lock()
+
+# Logs bigger than this are only counted from their last _MAX_JSONL_BYTES
+# on first read, bounding the worst-case parse of a runaway session
+_MAX_JSONL_BYTES = 128 * 1024 * 1024
+
+# Reverse scan for the current context size: chunk size and how far back to
+# look before falling back to a forward scan
+_TAIL_CHUNK_SIZE = 64 * 1024
+_MAX_TAIL_SCAN_BYTES = 2 * 1024 * 1024
+
+
+def _line_usage(line: bytes) -> dict:
+    """Return message.usage from one JSONL line, or {} if absent/malformed."""
+    # Most lines are user turns and tool results, often large. A substring
+    # check is far cheaper than decoding them only to find no usage.
+    if b'"usage"' not in line:
+        return _EMPTY
+    if _decode_session_line is not None:
+        try:
+            message = _decode_session_line(line).message
+        except ValueError:  # msgspec.DecodeError, including schema mismatches
+            return _EMPTY
+        return (message.usage if message else None) or _EMPTY
+    try:
+        data = _json_loads(line)
+    except ValueError:
+        return _EMPTY
+    return data.get("message", _EMPTY).get("usage") or _EMPTY
+
+
+def _add_line_usage(totals: list[int], line: bytes) -> None:
+    """Add the usage counts from one JSONL line to totals (_USAGE_KEYS order)."""
+    usage = _line_usage(line)
+    if usage:
+        get = usage.get
+        for i, key in enumerate(_USAGE_KEYS):
+            # `or 0` also covers fields that are present but null
+            totals[i] += get(key) or 0
+
+
 def _read_token_usage_from_jsonl(jsonl_path: Path) -> dict:
     """Read and aggregate token usage from a session JSONL file.
 
@@ -267,6 +362,10 @@ def _read_token_usage_from_jsonl(jsonl_path: Path) -> dict:
     JSON output (returns 0 for all token fields). This function reads the
     actual usage data from the session's JSONL file.
 
+    Repeated calls for the same file only parse the lines appended since the
+    previous call. A file that shrank is treated as new and parsed in full.
+    A file first seen at over _MAX_JSONL_BYTES is only counted from its tail.
+
     Args:
         jsonl_path: Path to the session JSONL file
 
@@ -277,37 +376,49 @@ def _read_token_usage_from_jsonl(jsonl_path: Path) -> dict:
         - cache_creation_input_tokens: Total cache creation tokens
         - cache_read_input_tokens: Total cache read tokens
     """
-    totals = {
-        "input_tokens": 0,
-        "output_tokens": 0,
-        "cache_creation_input_tokens": 0,
-        "cache_read_input_tokens": 0,
-    }
+    totals = [0] * len(_USAGE_KEYS)
 
     try:
-        with open(jsonl_path, "r") as f:
+        with open(jsonl_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            offset = 0
+            with _token_usage_cache_lock:
+                cached = _token_usage_cache.pop(jsonl_path, None)
+            if cached is not None and cached[0] <= size:
+                _, offset, cached_totals = cached
+                totals[:] = cached_totals
+                f.seek(offset)
+            elif size > _MAX_JSONL_BYTES:
+                logger.warning(
+                    "Session log %s is %d MiB; counting usage from the last %d MiB only",
+                    jsonl_path,
+                    size >> 20,
+                    _MAX_JSONL_BYTES >> 20,
+                )
+                f.seek(size - _MAX_JSONL_BYTES)
+                f.readline()  # Skip the partial line the seek landed in
+                offset = f.tell()
+
+            partial = b""
             for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    data = json.loads(line)
-                    usage = data.get("message", {}).get("usage", {})
-                    if usage:
-                        totals["input_tokens"] += usage.get("input_tokens", 0)
-                        totals["output_tokens"] += usage.get("output_tokens", 0)
-                        totals["cache_creation_input_tokens"] += usage.get(
-                            "cache_creation_input_tokens", 0
-                        )
-                        totals["cache_read_input_tokens"] += usage.get(
-                            "cache_read_input_tokens", 0
-                        )
-                except json.JSONDecodeError:
-                    continue
+                if not line.endswith(b"\n"):
+                    # Claude may still be writing this line; parse it now but
+                    # don't advance the cached offset past it.
+                    partial = line
+                    break
+                offset += len(line)
+                _add_line_usage(totals, line)
+
+            with _token_usage_cache_lock:
+                _token_usage_cache[jsonl_path] = (size, offset, tuple(totals))
+                if len(_token_usage_cache) > _TOKEN_USAGE_CACHE_SIZE:
+                    _token_usage_cache.pop(next(iter(_token_usage_cache)), None)
+
+            _add_line_usage(totals, partial)
     except (OSError, IOError) as e:
         logger.debug("Could not read JSONL file %s: %s", jsonl_path, e)
 
-    return totals
+    return dict(zip(_USAGE_KEYS, totals))
 
 
 def _get_context_size_from_jsonl(jsonl_path: Path) -> int:
@@ -319,33 +430,52 @@ def _get_context_size_from_jsonl(jsonl_path: Path) -> int:
 
     For compaction comparison, we want to compare context sizes, not cumulative usage.
 
+    The file is read backwards from the end in chunks, so usually only the
+    last few lines are parsed. If nothing turns up in the last
+    _MAX_TAIL_SCAN_BYTES, the rest of the file is scanned forwards.
+
     Args:
         jsonl_path: Path to the session JSONL file
 
     Returns:
         The input_tokens from the last message, or 0 if not found
     """
-    last_input_tokens = 0
-
     try:
-        with open(jsonl_path, "r") as f:
+        with open(jsonl_path, "rb") as f:
+            pos = f.seek(0, os.SEEK_END)
+            limit = max(0, pos - _MAX_TAIL_SCAN_BYTES)
+            # Leading bytes of the previous chunk, whose line starts earlier
+            head = b""
+            while pos > limit:
+                read_size = min(_TAIL_CHUNK_SIZE, pos - limit)
+                pos -= read_size
+                f.seek(pos)
+                lines = (f.read(read_size) + head).split(b"\n")
+                head = lines.pop(0) if pos > 0 else b""
+                for line in reversed(lines):
+                    input_tokens = _line_usage(line).get("input_tokens") or 0
+                    if input_tokens > 0:
+                        return input_tokens
+
+            if pos == 0:
+                return 0
+
+            # Fall back to a forward scan of the part the tail scan didn't cover
+            last_input_tokens = 0
+            remaining = pos + len(head)
+            f.seek(0)
             for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    data = json.loads(line)
-                    usage = data.get("message", {}).get("usage", {})
-                    if usage:
-                        input_tokens = usage.get("input_tokens", 0)
-                        if input_tokens > 0:
-                            last_input_tokens = input_tokens
-                except json.JSONDecodeError:
-                    continue
+                input_tokens = _line_usage(line).get("input_tokens") or 0
+                if input_tokens > 0:
+                    last_input_tokens = input_tokens
+                remaining -= len(line)
+                if remaining <= 0:
+                    break
+            return last_input_tokens
     except (OSError, IOError) as e:
         logger.debug("Could not read JSONL file %s: %s", jsonl_path, e)
 
-    return last_input_tokens
+    return 0
 
 
 @dataclass
@@ -364,6 +494,46 @@ class CostInfo:
     cache_read_tokens: int = 0
 
 
+def _iter_lines_reversed(text: str):
+    """Yield the lines of text last to first, without splitting all of it."""
+    end = len(text)
+    while end > 0:
+        start = text.rfind("\n", 0, end) + 1
+        yield text[start:end]
+        end = start - 1
+
+
+# Static parts of the task prompt built by ClaudeRunner._build_prompt; only
+# the card id/URL header and the move instruction vary per card.
+_PROMPT_GUIDELINES = """When done, commit your changes and provide a brief summary.
+
+Important guidelines:
+- Fetch the card details from Trello to get the full description and requirements
+- Check ALL comments on the card - if there are comments after your last "Claude:" comment, those contain feedback you need to address (the card was moved back to TODO)
+- As soon as you start working, add a comment starting with "Claude:" acknowledging you've started
+- Read and understand existing code before making changes
+- Write clean, maintainable code following the project's style
+- Follow red/green TDD: write a failing test first, then implement the minimal code to make it pass, then refactor if needed. Repeat for each change.
+- Add tests when appropriate
+- Commit with a clear, descriptive message
+- Push your changes to the remote repository
+- When done, add a comment starting with "Claude:" summarizing what was done
+- IMPORTANT: Whenever you mention a commit hash/SHA in comments or summaries, always include a clickable GitHub link to the commit (e.g., https://github.com/owner/repo/commit/<sha>). Use `git remote get-url origin` to determine the repository URL if needed.
+"""
+
+_PROMPT_FOOTER = """
+
+Voice note handling:
+- Check if the card has audio file attachments (voice notes, typically .opus, .ogg, .m4a, .mp3, .wav files)
+- If voice notes exist, check comments to see if they've already been transcribed (look for "Transcribed: [filename]" in comments)
+- For any new/untranscribed voice notes: download the file, transcribe it, and add a comment with the transcription like "Claude: Transcribed: [filename]\\n[transcription content]"
+- If this is a new card with a voice note and minimal description, update the card name and description based on your understanding of the transcribed voice note. IMPORTANT: Always preserve the first word of the existing card name (this is the project name)
+- Process the transcribed instructions along with any other card content
+
+Execution constraints:
+- Always run subagents sequentially. Do not use parallel subagent or Task execution."""
+
+
 @dataclass
 class ClaudeResult:
     """Result from a Claude Code execution."""
@@ -743,16 +913,16 @@ class ClaudeRunner:
         """Format milliseconds into a human-readable duration string."""
         if ms < 1000:
             return f"{ms}ms"
-        seconds = ms / 1000
+        # Round to tenths of a second once, then split with integer divmod so
+        # values like 59.96s carry into "1m 0.0s" rather than showing "60.0s"
+        seconds, tenths = divmod(int(ms + 50) // 100, 10)
         if seconds < 60:
-            return f"{seconds:.1f}s"
-        minutes = seconds / 60
+            return f"{seconds}.{tenths}s"
+        minutes, seconds = divmod(seconds, 60)
         if minutes < 60:
-            secs = seconds % 60
-            return f"{int(minutes)}m {secs:.1f}s"
-        hours = minutes / 60
-        mins = int(minutes % 60)
-        return f"{int(hours)}h {mins}m"
+            return f"{minutes}m {seconds}.{tenths}s"
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}h {minutes}m"
 
     async def _run_cost(
         self,
@@ -793,6 +963,7 @@ class ClaudeRunner:
             cmd.extend(["--mcp-config", mcp_config_json])
 
         cwd = Path(working_dir).expanduser() if working_dir else None
+        usage_task = None
 
         try:
             proc = await asyncio.create_subprocess_exec(
@@ -803,22 +974,32 @@ class ClaudeRunner:
                 limit=10 * 1024 * 1024,
             )
 
+            # Read token usage from JSONL file instead of /cost output
+            # Claude Code's /cost command returns 0 for all token fields,
+            # but the actual usage data is in the session's JSONL file.
+            # The task run already wrote it, so parse it in a worker thread
+            # while /cost is running.
+            jsonl_path = _get_session_jsonl_path(session_id, working_dir)
+            if jsonl_path:
+                usage_task = asyncio.ensure_future(
+                    asyncio.to_thread(_read_token_usage_from_jsonl, jsonl_path)
+                )
+
             stdout, stderr = await asyncio.wait_for(
                 proc.communicate(),
                 timeout=30,  # Cost check should be very quick
             )
 
-            output = stdout.decode()
-
             # Parse the result to extract cost info
             # The JSON output has fields directly: total_cost_usd, duration_ms, duration_api_ms
-            cost_info = CostInfo(raw_output=output)
+            cost_info = CostInfo(raw_output=stdout.decode())
 
-            for line in output.strip().split("\n"):
+            # Parse straight from the raw bytes; no need to decode first
+            for line in stdout.splitlines():
                 line = line.strip()
-                if line.startswith("{"):
+                if line.startswith(b"{"):
                     try:
-                        data = json.loads(line)
+                        data = _json_loads(line)
                         # Extract cost directly from JSON fields
                         if "total_cost_usd" in data:
                             cost_usd = data["total_cost_usd"]
@@ -831,15 +1012,14 @@ class ClaudeRunner:
                             cost_info.wall_duration = self._format_duration_ms(wall_ms)
                         # Note: code_changes is not available in /cost JSON output
                         break  # Found our JSON line, no need to continue
-                    except json.JSONDecodeError:
+                    except ValueError:
                         continue
 
-            # Read token usage from JSONL file instead of /cost output
-            # Claude Code's /cost command returns 0 for all token fields,
-            # but the actual usage data is in the session's JSONL file
-            jsonl_path = _get_session_jsonl_path(session_id, working_dir)
-            if jsonl_path:
-                usage = _read_token_usage_from_jsonl(jsonl_path)
+            if usage_task is not None:
+                # Awaiting hands any error to the handlers below, so the
+                # finally clause no longer needs to see this task
+                task, usage_task = usage_task, None
+                usage = await task
                 cost_info.input_tokens = usage["input_tokens"]
                 cost_info.output_tokens = usage["output_tokens"]
                 cost_info.cache_creation_tokens = usage["cache_creation_input_tokens"]
@@ -853,6 +1033,17 @@ class ClaudeRunner:
         except Exception as e:
             logger.warning("%s/cost failed: %s", prefix, e)
             return None
+        finally:
+            # /cost failed before the usage read was awaited
+            if usage_task is not None:
+                if not usage_task.done():
+                    usage_task.cancel()
+                elif not usage_task.cancelled() and usage_task.exception() is not None:
+                    logger.warning(
+                        "%sreading session usage failed: %s",
+                        prefix,
+                        usage_task.exception(),
+                    )
 
     async def run(
         self,
@@ -1302,13 +1493,12 @@ class ClaudeRunner:
             prefix: The project prefix (e.g., "[myproject] ")
             end: Line ending character
         """
-        # Prefix each line for multi-line output
-        if "\n" in text and end == "\n":
-            lines = text.split("\n")
-            for line in lines:
-                print(f"{prefix}{line}", flush=True)
-        else:
-            print(f"{prefix}{text}", end=end, flush=True)
+        # Prefix each line for multi-line output, then emit the block in one
+        # write so parallel projects' output can't interleave mid-block
+        if end == "\n":
+            text = text.replace("\n", "\n" + prefix)
+        sys.stdout.write(f"{prefix}{text}{end}")
+        sys.stdout.flush()
 
     def _print_stream_json_line(self, line: str, prefix: str) -> None:
         """Parse a stream-json line and print human-readable content.
@@ -1457,35 +1647,12 @@ class ClaudeRunner:
         else:
             move_instruction = "- Move the card to the READY TO TRY list when done"
 
-        return f"""Work on Trello card {card.id}
-
-Card URL: {card.url}
-
-When done, commit your changes and provide a brief summary.
-
-Important guidelines:
-- Fetch the card details from Trello to get the full description and requirements
-- Check ALL comments on the card - if there are comments after your last "Claude:" comment, those contain feedback you need to address (the card was moved back to TODO)
-- As soon as you start working, add a comment starting with "Claude:" acknowledging you've started
-- Read and understand existing code before making changes
-- Write clean, maintainable code following the project's style
-- Follow red/green TDD: write a failing test first, then implement the minimal code to make it pass, then refactor if needed. Repeat for each change.
-- Add tests when appropriate
-- Commit with a clear, descriptive message
-- Push your changes to the remote repository
-- When done, add a comment starting with "Claude:" summarizing what was done
-- IMPORTANT: Whenever you mention a commit hash/SHA in comments or summaries, always include a clickable GitHub link to the commit (e.g., https://github.com/owner/repo/commit/<sha>). Use `git remote get-url origin` to determine the repository URL if needed.
-{move_instruction}
-
-Voice note handling:
-- Check if the card has audio file attachments (voice notes, typically .opus, .ogg, .m4a, .mp3, .wav files)
-- If voice notes exist, check comments to see if they've already been transcribed (look for "Transcribed: [filename]" in comments)
-- For any new/untranscribed voice notes: download the file, transcribe it, and add a comment with the transcription like "Claude: Transcribed: [filename]\\n[transcription content]"
-- If this is a new card with a voice note and minimal description, update the card name and description based on your understanding of the transcribed voice note. IMPORTANT: Always preserve the first word of the existing card name (this is the project name)
-- Process the transcribed instructions along with any other card content
-
-Execution constraints:
-- Always run subagents sequentially. Do not use parallel subagent or Task execution."""
+        return (
+            f"Work on Trello card {card.id}\n\nCard URL: {card.url}\n\n"
+            + _PROMPT_GUIDELINES
+            + move_instruction
+            + _PROMPT_FOOTER
+        )
 
     def _parse_output(self, output: str) -> ClaudeResult:
         """Parse Claude Code's JSON output.
@@ -1496,21 +1663,25 @@ Execution constraints:
         session_id = None
         summary = "Task completed"
 
-        # Try to parse each line as JSON
-        for line in reversed(output.strip().split("\n")):
+        # Walk lines from the end (the result message is normally last)
+        # without splitting the whole output, and only decode lines that
+        # could carry one of the two keys we want.
+        for line in _iter_lines_reversed(output):
             line = line.strip()
-            if not line or not line.startswith("{"):
+            if not line.startswith("{"):
+                continue
+            if '"session_id"' not in line and '"result"' not in line:
                 continue
 
             try:
-                data = json.loads(line)
+                data = _json_loads(line)
                 if "session_id" in data:
                     session_id = data["session_id"]
                 if "result" in data:
                     summary = data["result"]
                 if session_id:
                     break
-            except json.JSONDecodeError:
+            except ValueError:
                 continue
 
         return ClaudeResult(
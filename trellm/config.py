@@ -1,5 +1,6 @@
 """Configuration loading for TreLLM."""
 
+import copy
 import json
 import os
 from dataclasses import dataclass, field
@@ -113,6 +114,110 @@ class Config:
     state_file: str = "~/.trellm/state.json"
     web: WebConfig = field(default_factory=WebConfig)
 
+    @classmethod
+    def from_dict(cls, data: dict) -> "Config":
+        """Build a Config from parsed config-file data.
+
+        Environment variables override the Trello credentials and lists, as
+        in load_config(); missing keys fall back to the defaults.
+        """
+        # Extract sections
+        trello_data = data.get("trello", {})
+        claude_data = data.get("claude", {})
+        polling_data = data.get("polling", {})
+        state_data = data.get("state", {})
+
+        # Build Trello config with env var overrides
+        trello = TrelloConfig(
+            api_key=os.environ.get("TRELLO_API_KEY", trello_data.get("api_key", "")),
+            api_token=os.environ.get("TRELLO_API_TOKEN", trello_data.get("api_token", "")),
+            board_id=os.environ.get("TRELLO_BOARD_ID", trello_data.get("board_id", "")),
+            todo_list_id=os.environ.get(
+                "TRELLO_TODO_LIST_ID", trello_data.get("todo_list_id", "")
+            ),
+            ready_to_try_list_id=trello_data.get("ready_to_try_list_id"),
+            done_board_id=trello_data.get("done_board_id"),
+            done_list_id=trello_data.get("done_list_id"),
+            icebox_list_id=trello_data.get("icebox_list_id"),
+        )
+
+        # Build project configs
+        projects: dict[str, ProjectConfig] = {}
+        for name, proj_data in claude_data.get("projects", {}).items():
+            # Parse maintenance config if present
+            maint_data = proj_data.get("maintenance", {})
+            maintenance = None
+            if maint_data:
+                maintenance = MaintenanceConfig(
+                    enabled=maint_data.get("enabled", False),
+                    interval=maint_data.get("interval", 10),
+                )
+
+            # Parse per-project browser override if present
+            proj_browser_data = proj_data.get("browser")
+            proj_browser = None
+            if proj_browser_data is not None:
+                proj_browser = BrowserConfig(
+                    enabled=proj_browser_data.get("enabled", False),
+                    patchright_path=proj_browser_data.get("patchright_path"),
+                )
+
+            projects[name] = ProjectConfig(
+                working_dir=proj_data.get("working_dir", ""),
+                session_id=proj_data.get("session_id"),
+                compact_prompt=proj_data.get("compact_prompt"),
+                maintenance=maintenance,
+                aliases=proj_data.get("aliases", []),
+                browser=proj_browser,
+                timeout=proj_data.get("timeout"),
+                runner=proj_data.get("runner"),
+            )
+
+        # Parse global maintenance config if present
+        global_maint_data = claude_data.get("maintenance", {})
+        global_maintenance = None
+        if global_maint_data:
+            global_maintenance = MaintenanceConfig(
+                enabled=global_maint_data.get("enabled", False),
+                interval=global_maint_data.get("interval", 10),
+            )
+
+        # Parse global browser config if present
+        global_browser_data = claude_data.get("browser")
+        global_browser = None
+        if global_browser_data is not None:
+            global_browser = BrowserConfig(
+                enabled=global_browser_data.get("enabled", False),
+                patchright_path=global_browser_data.get("patchright_path"),
+            )
+
+        # Build Claude config
+        claude = ClaudeConfig(
+            binary=claude_data.get("binary", "claude"),
+            timeout=claude_data.get("timeout", 1200),
+            yolo=claude_data.get("yolo", False),
+            runner=claude_data.get("runner", "print"),
+            projects=projects,
+            maintenance=global_maintenance,
+            browser=global_browser,
+        )
+
+        # Build web config
+        web_data = data.get("web", {})
+        web = WebConfig(
+            enabled=web_data.get("enabled", False),
+            host=web_data.get("host", "0.0.0.0"),
+            port=web_data.get("port", 8077),
+        )
+
+        return cls(
+            trello=trello,
+            claude=claude,
+            poll_interval=polling_data.get("interval_seconds", 5),
+            state_file=state_data.get("file", "~/.trellm/state.json"),
+            web=web,
+        )
+
     def get_working_dir(self, project: str) -> Optional[str]:
         """Get working directory for a project."""
         proj = self.claude.projects.get(project)
@@ -239,6 +344,29 @@ class Config:
         )
 
 
+# Parsed config YAML per path, tagged with the (mtime_ns, size) it was read
+# at. The polling loop reloads config every cycle; this way it only re-parses
+# when the file actually changed.
+_yaml_cache: dict[Path, tuple[tuple[int, int], dict]] = {}
+
+# libyaml's C loader when PyYAML was built against it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _read_yaml(path: Path) -> dict:
+    """Parse a YAML config file, reusing the last parse if it is unchanged."""
+    st = path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _yaml_cache.get(path)
+    if cached is None or cached[0] != stamp:
+        with open(path) as f:
+            cached = (stamp, yaml.load(f, Loader=_YamlLoader) or {})
+        _yaml_cache[path] = cached
+    # Copy so lists/dicts handed to the Config (e.g. aliases) aren't shared
+    # with the cache or with configs from earlier loads
+    return copy.deepcopy(cached[1])
+
+
 def load_config(config_path: Optional[str] = None) -> Config:
     """Load configuration from file and environment variables.
 
@@ -256,102 +384,6 @@ def load_config(config_path: Optional[str] = None) -> Config:
     # Load from file if exists
     data: dict = {}
     if path.exists():
-        with open(path) as f:
-            data = yaml.safe_load(f) or {}
-
-    # Extract sections
-    trello_data = data.get("trello", {})
-    claude_data = data.get("claude", {})
-    polling_data = data.get("polling", {})
-    state_data = data.get("state", {})
-
-    # Build Trello config with env var overrides
-    trello = TrelloConfig(
-        api_key=os.environ.get("TRELLO_API_KEY", trello_data.get("api_key", "")),
-        api_token=os.environ.get("TRELLO_API_TOKEN", trello_data.get("api_token", "")),
-        board_id=os.environ.get("TRELLO_BOARD_ID", trello_data.get("board_id", "")),
-        todo_list_id=os.environ.get(
-            "TRELLO_TODO_LIST_ID", trello_data.get("todo_list_id", "")
-        ),
-        ready_to_try_list_id=trello_data.get("ready_to_try_list_id"),
-        done_board_id=trello_data.get("done_board_id"),
-        done_list_id=trello_data.get("done_list_id"),
-        icebox_list_id=trello_data.get("icebox_list_id"),
-    )
-
-    # Build project configs
-    projects: dict[str, ProjectConfig] = {}
-    for name, proj_data in claude_data.get("projects", {}).items():
-        # Parse maintenance config if present
-        maint_data = proj_data.get("maintenance", {})
-        maintenance = None
-        if maint_data:
-            maintenance = MaintenanceConfig(
-                enabled=maint_data.get("enabled", False),
-                interval=maint_data.get("interval", 10),
-            )
-
-        # Parse per-project browser override if present
-        proj_browser_data = proj_data.get("browser")
-        proj_browser = None
-        if proj_browser_data is not None:
-            proj_browser = BrowserConfig(
-                enabled=proj_browser_data.get("enabled", False),
-                patchright_path=proj_browser_data.get("patchright_path"),
-            )
-
-        projects[name] = ProjectConfig(
-            working_dir=proj_data.get("working_dir", ""),
-            session_id=proj_data.get("session_id"),
-            compact_prompt=proj_data.get("compact_prompt"),
-            maintenance=maintenance,
-            aliases=proj_data.get("aliases", []),
-            browser=proj_browser,
-            timeout=proj_data.get("timeout"),
-            runner=proj_data.get("runner"),
-        )
-
-    # Parse global maintenance config if present
-    global_maint_data = claude_data.get("maintenance", {})
-    global_maintenance = None
-    if global_maint_data:
-        global_maintenance = MaintenanceConfig(
-            enabled=global_maint_data.get("enabled", False),
-            interval=global_maint_data.get("interval", 10),
-        )
-
-    # Parse global browser config if present
-    global_browser_data = claude_data.get("browser")
-    global_browser = None
-    if global_browser_data is not None:
-        global_browser = BrowserConfig(
-            enabled=global_browser_data.get("enabled", False),
-            patchright_path=global_browser_data.get("patchright_path"),
-        )
+        data = _read_yaml(path)
 
-    # Build Claude config
-    claude = ClaudeConfig(
-        binary=claude_data.get("binary", "claude"),
-        timeout=claude_data.get("timeout", 1200),
-        yolo=claude_data.get("yolo", False),
-        runner=claude_data.get("runner", "print"),
-        projects=projects,
-        maintenance=global_maintenance,
-        browser=global_browser,
-    )
-
-    # Build web config
-    web_data = data.get("web", {})
-    web = WebConfig(
-        enabled=web_data.get("enabled", False),
-        host=web_data.get("host", "0.0.0.0"),
-        port=web_data.get("port", 8077),
-    )
-
-    return Config(
-        trello=trello,
-        claude=claude,
-        poll_interval=polling_data.get("interval_seconds", 5),
-        state_file=state_data.get("file", "~/.trellm/state.json"),
-        web=web,
-    )
+    return Config.from_dict(data)
@@ -0,0 +1,41 @@
+"""Error-detection regex patterns for Claude Code output.
+
+Kept free of runtime dependencies so the patterns can be imported (e.g. by
+tests exercising only the regexes) without pulling in the subprocess runner
+and its aiohttp/yaml import graph. ``trellm.claude`` re-exports every name.
+"""
+
+import re
+
+# Error patterns for Claude Code
+# Detailed pattern with token counts (e.g., "prompt is too long: 206453 tokens > 200000 maximum")
+PROMPT_TOO_LONG_DETAILED_PATTERN = re.compile(r"prompt is too long: (\d+) tokens? > (\d+) maximum")
+# Simple pattern for when Claude just says "Prompt is too long"
+PROMPT_TOO_LONG_SIMPLE_PATTERN = re.compile(r"prompt is too long", re.IGNORECASE)
+# API error pattern for rate limits
+RATE_LIMIT_PATTERN = re.compile(r"rate_limit_error")
+# User-facing rate limit pattern (e.g., "You've hit your limit")
+RATE_LIMIT_USER_PATTERN = re.compile(r"you've hit your limit", re.IGNORECASE)
+# Org/monthly usage limit (e.g., "You've hit your org's monthly usage limit").
+# Distinct from session rate limits because it has no parseable reset time and
+# typically lasts hours-to-weeks — busy-looping retries on this error wastes
+# polling cycles and pollutes the dashboard. The polling loop pauses globally
+# when this is hit; see trellm.claude.MonthlyLimitError.
+MONTHLY_LIMIT_PATTERN = re.compile(
+    r"hit your\s+org'?s?\s+monthly\s+usage\s+limit", re.IGNORECASE
+)
+# Claude Code OAuth "extra usage" depletion (e.g.,
+# "You're out of extra usage · resets 5:40am (UTC)"). Distinct wording from
+# the org-monthly limit but semantically the same outage class — same Claude
+# account = same wallet, so a global pause is correct. We treat it as a
+# MonthlyLimitError so the polling-loop pause path is reused (see Gotcha #8
+# in CLAUDE.md). Without this, the polling loop spawns the same card every
+# poll cycle until the limit resets (388 spawns observed for two smugcoin
+# cards in card ZCwyx8wO before the fix).
+EXTRA_USAGE_PATTERN = re.compile(r"out\s+of\s+(?:extra\s+)?usage", re.IGNORECASE)
+# Reset time as duration (e.g., "resets in 2 hours", "resets in 30 minutes")
+RATE_LIMIT_RESET_DURATION_PATTERN = re.compile(r"resets?\s+(?:in\s+)?(\d+)\s*(hours?|minutes?|h|m|days?|d)", re.IGNORECASE)
+# Reset time as clock time (e.g., "resets 8pm (UTC)", "resets 10am")
+RATE_LIMIT_RESET_TIME_PATTERN = re.compile(r"resets?\s+(\d{1,2})(?::(\d{2}))?\s*(am|pm)\s*(?:\(?(UTC|GMT)?\)?)?", re.IGNORECASE)
+# Session not found (e.g., "No conversation found with session ID: ...")
+SESSION_NOT_FOUND_PATTERN = re.compile(r"No conversation found with session ID", re.IGNORECASE)
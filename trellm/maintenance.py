@@ -6,13 +6,17 @@ import logging
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 
 from .config import ClaudeConfig, MaintenanceConfig, TrelloConfig
 from .trello import TrelloClient
 
 logger = logging.getLogger(__name__)
 
+# Runs a claude argv in a working directory with a timeout in seconds, and
+# returns (returncode, stdout, stderr)
+ClaudeExec = Callable[[list[str], Path, float], Awaitable[tuple[int, bytes, bytes]]]
+
 
 @dataclass
 class MaintenanceResult:
@@ -103,6 +107,22 @@ Your final output MUST be a summary in this exact format (this will be saved to
 Be concise. Focus on actionable improvements. DO NOT create or modify any files."""
 
 
+async def _exec_claude(cmd: list[str], cwd: Path, timeout: float) -> tuple[int, bytes, bytes]:
+    """Run a claude command as a subprocess and wait for it to finish.
+
+    Raises asyncio.TimeoutError if it takes longer than `timeout` seconds.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        limit=10 * 1024 * 1024,  # 10MB buffer
+    )
+    stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+    return proc.returncode, stdout, stderr
+
+
 async def _run_compact(
     session_id: str,
     working_dir: str,
@@ -111,6 +131,7 @@ async def _run_compact(
     compact_prompt: Optional[str] = None,
     browser_enabled: bool = False,
     mcp_config_json: Optional[str] = None,
+    claude_exec: ClaudeExec = _exec_claude,
 ) -> Optional[str]:
     """Run /compact command on a session to reduce context size.
 
@@ -124,6 +145,7 @@ async def _run_compact(
             `--mcp-config <json>` so the patchright MCP loads in the
             post-compact session.
         mcp_config_json: JSON config string for `claude --mcp-config`.
+        claude_exec: Runs the command; defaults to spawning a subprocess.
 
     Returns:
         New session ID if successful, None otherwise
@@ -155,24 +177,14 @@ async def _run_compact(
     cwd = Path(working_dir).expanduser()
 
     try:
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=cwd,
-            limit=10 * 1024 * 1024,
-        )
-
-        stdout, stderr = await asyncio.wait_for(
-            proc.communicate(),
-            timeout=120,  # Compact should be quick
-        )
+        # Compact should be quick
+        returncode, stdout, stderr = await claude_exec(cmd, cwd, 120)
 
-        if proc.returncode != 0:
+        if returncode != 0:
             logger.warning(
                 "%s/compact failed with return code %d: %s",
                 prefix,
-                proc.returncode,
+                returncode,
                 stderr.decode(),
             )
             return None
@@ -220,6 +232,7 @@ async def run_maintenance(
     browser_enabled: bool = False,
     mcp_config_json: Optional[str] = None,
     runner_mode: str = "print",
+    claude_exec: ClaudeExec = _exec_claude,
 ) -> MaintenanceResult:
     """Run the maintenance skill for a project.
 
@@ -242,6 +255,8 @@ async def run_maintenance(
             backend; interactive maintenance is intentionally not wired yet —
             M4 landed `InteractiveSession` but keeps maintenance disabled for
             interactive projects (see docs/claude-interactive.md §9).
+        claude_exec: Runs each claude command; defaults to spawning a
+            subprocess. Tests pass a fake to check the argv without one.
 
     Returns:
         MaintenanceResult with success status and summary
@@ -289,6 +304,7 @@ async def run_maintenance(
             compact_prompt=compact_prompt,
             browser_enabled=browser_enabled,
             mcp_config_json=mcp_config_json,
+            claude_exec=claude_exec,
         )
         if compacted_session_id:
             current_session_id = compacted_session_id
@@ -327,26 +343,15 @@ async def run_maintenance(
     cwd = Path(working_dir).expanduser()
 
     try:
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-            cwd=cwd,
-            limit=10 * 1024 * 1024,  # 10MB buffer
-        )
-
         # Use a longer timeout for maintenance tasks (10 minutes)
-        stdout, stderr = await asyncio.wait_for(
-            proc.communicate(),
-            timeout=600,
-        )
+        returncode, stdout, stderr = await claude_exec(cmd, cwd, 600)
 
-        if proc.returncode != 0:
+        if returncode != 0:
             stderr_text = stderr.decode()
             logger.error(
                 "%sMaintenance failed with return code %d: %s",
                 prefix,
-                proc.returncode,
+                returncode,
                 stderr_text,
             )
             return MaintenanceResult(
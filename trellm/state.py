@@ -119,15 +119,33 @@ class StateManager:
     State includes:
     - Session IDs per project (for Claude Code --resume)
     - Processed card IDs with timestamps
+
+    With no state_file the state is kept in memory only and never written.
+    Used as a context manager, it saves once when the block exits instead of
+    after every change, and not at all if the block raises.
     """
 
-    def __init__(self, state_file: str):
-        self.path = Path(state_file).expanduser()
+    def __init__(self, state_file: Optional[str] = None):
+        self.path = None if state_file is None else Path(state_file).expanduser()
         self.state = self._load()
+        # Open `with` blocks; mutators skip their write while this is non-zero
+        self._batch_depth = 0
+
+    def __enter__(self) -> "StateManager":
+        """Batch writes: mutators inside the block save once, on exit."""
+        self._batch_depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._batch_depth -= 1
+        # A block that raised may have applied only part of its changes;
+        # don't persist them
+        if exc_type is None:
+            self._save()
 
     def _load(self) -> dict:
         """Load state from file."""
-        if self.path.exists():
+        if self.path is not None and self.path.exists():
             try:
                 data = json.loads(self.path.read_text())
                 # Ensure stats structure exists
@@ -160,7 +178,11 @@ class StateManager:
 
     def _save(self) -> None:
         """Save state to file, running rollup to keep data compact."""
+        if self._batch_depth:
+            return
         self._rollup_old_dates()
+        if self.path is None:
+            return
         self.path.parent.mkdir(parents=True, exist_ok=True)
         self.path.write_text(json.dumps(self.state, indent=2))
 
@@ -297,6 +319,29 @@ class StateManager:
         bucket["total_cache_creation_tokens"] += stats.get("total_cache_creation_tokens", 0)
         bucket["total_cache_read_tokens"] += stats.get("total_cache_read_tokens", 0)
 
+    def bulk_load(
+        self,
+        *,
+        sessions: Optional[dict[str, str]] = None,
+        tickets: Optional[dict[str, list[str]]] = None,
+        costs: Optional[list[dict]] = None,
+    ) -> None:
+        """Seed several entries at once, writing the state file only once.
+
+        Args:
+            sessions: Session ID per project, as for set_session()
+            tickets: Processed card IDs per project, as for add_processed_ticket()
+            costs: Keyword arguments for each record_cost() call
+        """
+        with self:
+            for project, session_id in (sessions or {}).items():
+                self.set_session(project, session_id)
+            for project, card_ids in (tickets or {}).items():
+                for card_id in card_ids:
+                    self.add_processed_ticket(project, card_id)
+            for cost in costs or []:
+                self.record_cost(**cost)
+
     def get_session(self, project: str) -> Optional[str]:
         """Get session ID for a project."""
         session = self.state.get("sessions", {}).get(project)